@@ -119,9 +119,10 @@ echo.
 REM List of packages to install (excluding built-in modules)
 REM - pandas: Data manipulation and Excel/CSV export
 REM - pywin32: Windows COM support for Access database
+REM - pyodbc: Faster Access reads through the Access ODBC driver (ADO is used without it)
 REM - PyYAML: YAML config file parsing
-REM - openpyxl: Excel file creation (required by pandas.to_excel)
-set "PACKAGES=pandas pywin32 PyYAML openpyxl"
+REM - XlsxWriter: Excel file creation (streaming export and pandas.to_excel)
+set "PACKAGES=pandas pywin32 pyodbc PyYAML XlsxWriter"
 
 for %%p in (%PACKAGES%) do (
     echo Installing %%p...
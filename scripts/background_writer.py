@@ -0,0 +1,90 @@
+"""
+Background writer threads shared by the Access export scripts.
+
+The export scripts read rows from Access on the calling thread (COM objects
+belong to the thread that created them) and hand each already-fetched block
+of rows to a sink - an Excel workbook, a CSV or Parquet file, or a SQLite
+table - through a BackgroundWriter, so writing one block overlaps the fetch
+of the next.
+"""
+
+import queue
+import threading
+
+
+class BackgroundWriter:
+    """
+    Run a sink's writes on a worker thread, fed through a bounded queue.
+    
+    A sink is any object with write(block) and close() methods, where a block
+    is a column-major list of column value lists (as Recordset.GetRows returns).
+    A sink may also have an abort() method, called instead of close() when the
+    export failed, to discard what it has written so far.
+    sqlite3 and pywin32 release the GIL while they wait on SQLite and the
+    provider. The queue bound keeps at most maxsize blocks in memory.
+    """
+    
+    def __init__(self, sink, maxsize):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        while True:
+            block = self.queue.get()
+            if block is None:
+                return
+            # After a failure keep draining the queue so the reader never blocks
+            if self.error is None:
+                try:
+                    self.sink.write(block)
+                except Exception as e:
+                    self.error = e
+    
+    def write(self, block):
+        """Queue one block, raising any error the writer thread has hit."""
+        if self.error is not None:
+            raise self.error
+        self.queue.put(block)
+    
+    def close(self, abort=False):
+        """
+        Wait for queued blocks to be written, then close the sink.
+        
+        Args:
+            abort: The export failed; abort the sink instead of closing it
+                (it is also aborted if one of its writes failed)
+        """
+        self.queue.put(None)
+        self.thread.join()
+        if abort or self.error is not None:
+            getattr(self.sink, 'abort', self.sink.close)()
+        else:
+            self.sink.close()
+        if self.error is not None:
+            raise self.error
+
+
+def close_writers(writers, abort=False):
+    """
+    Close every writer, even if an earlier one fails.
+    
+    Each writer's thread is joined and its sink closed (so an Excel workbook
+    is still saved when the SQLite writer fails); the first error is raised
+    once all of them are closed.
+    
+    Args:
+        writers: BackgroundWriter objects to close, in order
+        abort: Abort the sinks instead of closing them (see BackgroundWriter.close)
+    """
+    close_error = None
+    for writer in writers:
+        try:
+            writer.close(abort)
+        except Exception as e:
+            if close_error is None:
+                close_error = e
+    if close_error is not None:
+        raise close_error
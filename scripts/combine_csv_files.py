@@ -6,7 +6,7 @@ This script reads all CSV files from a specified folder, combines them into a si
 CSV file, and optionally removes duplicates based on specified columns.
 
 Usage:
-  python combine_csv_files.py <input_folder> [--output <output_file>] [--deduplicate] [--key <column>]
+  python combine_csv_files.py <input_folder> [--output <output_file>] [--deduplicate] [--key <column>] [--workers <n>] [--engine {python,duckdb}]
 
 Examples:
   python combine_csv_files.py my_splits
@@ -16,60 +16,693 @@ Examples:
 """
 
 import csv
+import codecs
+import hashlib
+import mmap
 import os
 import sys
 import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from collections import OrderedDict
 
+import numpy as np
+import pandas as pd
 
-def read_csv_with_fallback(file_path):
+# Rows per DataFrame chunk when streaming input files
+CHUNK_SIZE = 100_000
+
+ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'utf-16']
+
+
+# Bytes decoded at a time while checking a file's encoding
+DETECT_BLOCK_SIZE = 1 << 20
+
+# I/O buffer sizes: fewer, larger reads and writes on big merges
+INPUT_BUFFER_SIZE = 1 << 18
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Encodings whose bytes can be copied straight into the UTF-8 output
+VERBATIM_ENCODINGS = ('utf-8', 'utf-8-sig')
+
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+
+def _decodes_as(file_path, encoding):
+    """Return True if the whole file decodes with the given encoding."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        with open(file_path, 'rb') as infile:
+            while True:
+                block = infile.read(DETECT_BLOCK_SIZE)
+                # Incremental decode tolerates a multi-byte character split between blocks
+                decoder.decode(block, final=not block)
+                if not block:
+                    return True
+    except (UnicodeDecodeError, UnicodeError):
+        return False
+
+
+def detect_encoding(file_path):
     """
-    Try to read a CSV file with multiple encoding options.
+    Detect a file's encoding from a byte-order mark or by decoding the whole file.
+    
+    The whole file is checked, not just its start: the UTF-8 paths copy raw
+    bytes into the output, so a stray latin-1 byte late in the file would
+    otherwise end up in the "UTF-8" output or fail the file halfway through.
+    A BOM's encoding is tried first, then the candidates in ENCODINGS in order.
     
     Args:
         file_path: Path to the CSV file
     
     Returns:
-        tuple: (rows: list, headers: list) or (None, None) if failed
+        str: Encoding name, or None if no candidate decodes the file
     """
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1', 'utf-16']
+    with open(file_path, 'rb') as infile:
+        head = infile.read(len(codecs.BOM_UTF8))
     
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as infile:
-                reader = csv.DictReader(infile)
-                headers = reader.fieldnames
-                
-                # Filter out None headers (empty columns)
-                if headers:
-                    headers = [h for h in headers if h is not None and h.strip()]
-                
-                rows = []
-                for row in reader:
-                    # Remove None keys from row
-                    clean_row = {k: v for k, v in row.items() if k is not None and k.strip()}
-                    rows.append(clean_row)
-                
-                return rows, headers, encoding
-        except (UnicodeDecodeError, UnicodeError):
-            continue
-        except Exception as e:
-            print(f"[WARNING] Error with {encoding} encoding: {e}")
+    candidates = [encoding for bom, encoding in BOMS if head.startswith(bom)][:1]
+    candidates += ENCODINGS
+    
+    for encoding in candidates:
+        if _decodes_as(file_path, encoding):
+            return encoding
+    
+    return None
+
+
+def _iter_chunks(file_path, encoding, headers, chunksize):
+    """Yield DataFrame chunks of a CSV file restricted to the given headers."""
+    with open(file_path, 'rb', buffering=INPUT_BUFFER_SIZE) as infile:
+        # Reading only the header's columns means a row with more fields than
+        # the header keeps its values in place (the extras are dropped) rather
+        # than stopping the parser or having pandas use the first field as the
+        # index and shift every value left
+        with pd.read_csv(infile, dtype=str, keep_default_na=False, encoding=encoding,
+                         usecols=headers, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk[headers]
+
+
+def read_csv_frame(file_path, encoding, headers):
+    """
+    Parse a whole CSV file into a DataFrame (runs in a worker process).
+    
+    Args:
+        file_path: Path to the CSV file
+        encoding: Encoding detected by read_csv_with_fallback
+        headers: Cleaned header list for the file
+    
+    Returns:
+        DataFrame: All rows, restricted to headers
+    """
+    with open(file_path, 'rb', buffering=INPUT_BUFFER_SIZE) as infile:
+        frame = pd.read_csv(infile, dtype=str, keep_default_na=False, encoding=encoding,
+                            usecols=headers)
+    return frame[headers]
+
+
+def read_csv_with_fallback(file_path, chunksize=CHUNK_SIZE):
+    """
+    Open a CSV file for chunked reading using its detected encoding.
+    
+    Only the header is parsed here; rows are read lazily by iterating the
+    returned chunks. All values are read as strings so the combined output
+    matches the input text exactly (no numeric/date inference).
+    
+    Args:
+        file_path: Path to the CSV file
+        chunksize: Number of rows per DataFrame chunk
+    
+    Returns:
+        tuple: (chunks: iterator of DataFrame, headers: list, encoding: str,
+            column_names: dict) or (None, None, None, None) if failed. headers
+            is empty if the file is empty or has no header row
+    """
+    encoding = detect_encoding(file_path)
+    if encoding is None:
+        return None, None, None, None
+    
+    try:
+        header_frame = pd.read_csv(file_path, dtype=str, nrows=0, encoding=encoding)
+    except pd.errors.EmptyDataError:
+        # Nothing but blank lines (or no bytes at all): not an encoding problem
+        return iter(()), [], encoding, {}
+    except Exception as e:
+        print(f"[WARNING] Error with {encoding} encoding: {e}")
+        return None, None, None, None
+    
+    # pandas renames a repeated column "Name.1", "Name.2", ... (the BQE export
+    # has two "Created By" columns). Those unique labels line the columns up
+    # across files; column_names maps them back to the names in the file
+    column_names = dict(zip(header_frame.columns, read_raw_header(file_path, encoding)))
+    
+    # Filter out empty headers (pandas names them "Unnamed: N")
+    headers = [
+        h for h in header_frame.columns
+        if isinstance(h, str) and h.strip() and not h.startswith('Unnamed: ')
+    ]
+    
+    return _iter_chunks(file_path, encoding, headers, chunksize), headers, encoding, column_names
+
+
+def _digest64(data):
+    """Return an unsigned 64-bit blake2b digest of the given bytes."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def chunk_digests(chunk, key_column=None):
+    """
+    Compute a 64-bit digest per row of a chunk in one vectorized pass.
+    
+    Args:
+        chunk: DataFrame whose columns are in output header order
+        key_column: Column to digest, or None to digest all columns
+    
+    Returns:
+        numpy.ndarray: uint64 digest per row
+    """
+    values = chunk[key_column] if key_column else chunk
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def new_row_mask(digests, seen):
+    """
+    Flag rows whose digest has not been seen before and record them in seen.
+    
+    Repeats within the chunk are found by duplicated(), and digests from earlier
+    chunks by mapping seen.__contains__ over the chunk, so the per-row work runs
+    in C rather than as Python bytecode.
+    
+    Args:
+        digests: uint64 array from chunk_digests
+        seen: Set of digests kept so far; updated in place
+    
+    Returns:
+        numpy.ndarray: Boolean mask of rows to keep
+    """
+    mask = ~pd.Series(digests).duplicated().to_numpy()
+    if seen:
+        mask &= ~np.fromiter(map(seen.__contains__, digests.tolist()), dtype=bool, count=len(digests))
+    seen.update(digests[mask].tolist())
+    return mask
+
+
+def read_raw_header(file_path, encoding):
+    """Return a file's header row exactly as written (no column filtering)."""
+    with open(file_path, 'r', newline='', encoding=encoding) as infile:
+        return next(csv.reader(infile), [])
+
+
+def count_records(data, in_quotes=False):
+    """
+    Count CSV record terminators in a block of bytes.
+    
+    Newlines inside quoted fields are not counted. Quote state is carried
+    between blocks so a file can be scanned in pieces.
+    
+    Args:
+        data: Block of CSV bytes
+        in_quotes: Whether the block starts inside a quoted field
+    
+    Returns:
+        tuple: (records: int, in_quotes: bool)
+    """
+    if not in_quotes and b'"' not in data:
+        return data.count(b'\n'), False
+    
+    records = 0
+    pieces = data.split(b'\n')
+    for piece in pieces[:-1]:
+        if piece.count(b'"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            records += 1
+    if pieces[-1].count(b'"') % 2:
+        in_quotes = not in_quotes
+    
+    return records, in_quotes
+
+
+def drop_blank_lines(data, in_quotes=False):
+    """
+    Remove blank lines from a block of complete CSV lines and count its records.
+    
+    Empty lines inside a quoted field are part of the field's value and kept.
+    
+    Args:
+        data: Block of CSV bytes ending with a newline
+        in_quotes: Whether the block starts inside a quoted field
+    
+    Returns:
+        tuple: (data: bytes without blank lines, records: int, in_quotes: bool)
+    """
+    kept = []
+    records = 0
+    for piece in data.split(b'\n')[:-1]:
+        if not in_quotes and piece in (b'', b'\r'):
             continue
+        kept.append(piece)
+        if piece.count(b'"') % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            records += 1
+    kept.append(b'')
+    
+    return b'\n'.join(kept), records, in_quotes
+
+
+def concatenate_files(sources, output_file, stats):
+    """
+    Combine files that all share the output header by copying their bytes.
+    
+    The first file's header line is written once and every file's data rows
+    are appended verbatim, so nothing is decoded or parsed. Blank lines are
+    skipped, as they are when deduplicating or parsing the files. Only valid
+    when no deduplication is requested and every file is UTF-8 with exactly
+    the output header.
+    
+    Args:
+        sources: List of (csv_file, chunks, encoding, headers) tuples from read_csv_with_fallback
+        output_file: Path of the output CSV file
+        stats: Dictionary updated with 'files_processed' and 'total_rows' counts
+    
+    Returns:
+        int: Number of data rows written
+    """
+    newline = b'\r\n'
+    header_written = False
+    unterminated = False
+    
+    with open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as outfile:
+        for csv_file, _, used_encoding, _ in sources:
+            file_rows = 0
+            # Where this file's output starts, to roll it back if reading fails
+            file_start = outfile.tell()
+            had_header = header_written
+            was_unterminated = unterminated
+            try:
+                with open(csv_file, 'rb', buffering=INPUT_BUFFER_SIZE) as infile:
+                    if used_encoding == 'utf-8-sig':
+                        infile.read(len(codecs.BOM_UTF8))
+                    header_line = infile.readline()
+                    
+                    if not header_written:
+                        if header_line.endswith(b'\n'):
+                            newline = b'\r\n' if header_line.endswith(b'\r\n') else b'\n'
+                            outfile.write(header_line)
+                        else:
+                            outfile.write(header_line + newline)
+                        header_written = True
+                    
+                    in_quotes = False
+                    partial_line = b''
+                    while True:
+                        block = infile.read(OUTPUT_BUFFER_SIZE)
+                        if not block:
+                            break
+                        # Only whole lines are written, so a blank line is never split
+                        # between blocks; the partial last line waits for the next block
+                        data = partial_line + block
+                        cut = data.rfind(b'\n') + 1
+                        data, partial_line = data[:cut], data[cut:]
+                        if data.startswith((b'\n', b'\r\n')) or b'\n\n' in data or b'\n\r\n' in data:
+                            data, records, in_quotes = drop_blank_lines(data, in_quotes)
+                        else:
+                            records, in_quotes = count_records(data, in_quotes)
+                        if not data:
+                            continue
+                        if unterminated:
+                            # Previous file had no trailing newline
+                            outfile.write(newline)
+                            unterminated = False
+                        outfile.write(data)
+                        file_rows += records
+                    
+                    if partial_line.rstrip(b'\r'):
+                        # Last line has no trailing newline
+                        if unterminated:
+                            outfile.write(newline)
+                        outfile.write(partial_line)
+                        file_rows += 1
+                        unterminated = True
+            except Exception as e:
+                # Drop whatever part of the file was already copied
+                outfile.seek(file_start)
+                outfile.truncate()
+                header_written = had_header
+                unterminated = was_unterminated
+                print(f"[ERROR] Error reading {csv_file.name}: {e}")
+                continue
+            
+            stats['total_rows'] += file_rows
+            encoding_info = f" (encoding: {used_encoding})" if used_encoding != 'utf-8' else ""
+            print(f"[OK] {csv_file.name} ({file_rows} rows){encoding_info}")
+            stats['files_processed'] += 1
+        
+        if unterminated:
+            outfile.write(newline)
+    
+    return stats['total_rows']
+
+
+def iter_record_spans(data, pos=0):
+    """
+    Yield (start, end) byte offsets of each CSV record in a buffer.
+    
+    end is the offset of the record's terminating newline (or the buffer
+    length for an unterminated last record). Newlines inside quoted fields
+    do not end a record.
+    
+    Args:
+        data: bytes-like buffer such as an mmap
+        pos: Offset of the first record
+    
+    Yields:
+        tuple: (start: int, end: int)
+    """
+    size = len(data)
+    while pos < size:
+        end = data.find(b'\n', pos)
+        while end != -1 and data[pos:end].count(b'"') % 2:
+            end = data.find(b'\n', end + 1)
+        if end == -1:
+            end = size
+        yield pos, end
+        pos = end + 1
+
+
+def concatenate_unique_records(sources, output_file, stats):
+    """
+    Combine files that all share the output header, dropping duplicate rows.
+    
+    Each file is memory-mapped and its records are fingerprinted directly
+    from the raw bytes, so rows are never decoded or parsed; only an 8-byte
+    digest per unique row is kept in memory and unique rows are written
+    verbatim. Rows that differ only in quoting style are treated as distinct.
+    Blank lines are skipped, as they are when copying or parsing the files.
+    
+    Args:
+        sources: List of (csv_file, chunks, encoding, headers) tuples from read_csv_with_fallback
+        output_file: Path of the output CSV file
+        stats: Dictionary updated with 'files_processed' and 'total_rows' counts
+    
+    Returns:
+        int: Number of data rows written
+    """
+    newline = b'\r\n'
+    header_written = False
+    seen = set()
+    rows_written = 0
+    
+    with open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as outfile:
+        for csv_file, _, used_encoding, _ in sources:
+            file_rows = 0
+            # Where this file's output starts and the digests it added, to
+            # roll it back if reading fails
+            file_start = outfile.tell()
+            had_header = header_written
+            file_digests = []
+            try:
+                with open(csv_file, 'rb') as infile, \
+                        mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    start = len(codecs.BOM_UTF8) if used_encoding == 'utf-8-sig' else 0
+                    records = iter_record_spans(mm, start)
+                    
+                    header_start, header_end = next(records)
+                    if not header_written:
+                        if mm[header_end - 1:header_end] == b'\r':
+                            newline = b'\r\n'
+                        elif header_end < len(mm):
+                            newline = b'\n'
+                        outfile.write(mm[header_start:header_end].rstrip(b'\r') + newline)
+                        header_written = True
+                    
+                    for start, end in records:
+                        record = mm[start:end]
+                        if record.endswith(b'\r'):
+                            record = record[:-1]
+                        if not record:
+                            continue
+                        file_rows += 1
+                        
+                        digest = _digest64(record)
+                        if digest in seen:
+                            continue
+                        seen.add(digest)
+                        file_digests.append(digest)
+                        
+                        outfile.write(record)
+                        outfile.write(newline)
+            except Exception as e:
+                # Drop whatever part of the file was already written
+                outfile.seek(file_start)
+                outfile.truncate()
+                header_written = had_header
+                seen.difference_update(file_digests)
+                print(f"[ERROR] Error reading {csv_file.name}: {e}")
+                continue
+            
+            rows_written += len(file_digests)
+            
+            stats['total_rows'] += file_rows
+            encoding_info = f" (encoding: {used_encoding})" if used_encoding != 'utf-8' else ""
+            print(f"[OK] {csv_file.name} ({file_rows} rows){encoding_info}")
+            stats['files_processed'] += 1
+    
+    return rows_written
+
+
+def _future_result(source, future):
+    """Return (source, frame, error) for a finished parse job."""
+    try:
+        return source, future.result(), None
+    except Exception as e:
+        return source, None, e
+
+
+def _iter_parallel(sources, workers):
+    """
+    Parse files in a process pool and yield (source, frame, error) in file order.
+    
+    Each file is submitted separately so a failure in one file does not stop
+    the others; results are consumed in submission order to keep the output
+    and log deterministic. At most `workers` files are submitted ahead of the
+    one being consumed, and each future is dropped once its frame is yielded,
+    so only a bounded number of parsed files is held in memory at a time.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for source in sources:
+            csv_file, _, used_encoding, file_headers = source
+            pending.append((source, executor.submit(read_csv_frame, csv_file, used_encoding, file_headers)))
+            if len(pending) >= workers:
+                yield _future_result(*pending.popleft())
+        
+        while pending:
+            yield _future_result(*pending.popleft())
+
+
+def _frame_chunks(frame, error):
+    """Yield a worker's parsed frame as a single chunk, or raise its error."""
+    if error is not None:
+        raise error
+    yield frame
+
+
+def iter_file_chunks(sources, workers=1):
+    """
+    Pair each CSV source with an iterator over its DataFrame chunks.
+    
+    Reading errors are raised while iterating a file's chunks, so the caller
+    can discard the rows it already took from that file.
+    
+    Args:
+        sources: List of (csv_file, chunks, encoding, headers) tuples from read_csv_with_fallback
+        workers: Number of worker processes; 1 streams each file chunk by chunk,
+            otherwise each file arrives as a single chunk
+    
+    Yields:
+        tuple: (source, chunks) in file order, with each file's own headers
+    """
+    if workers > 1:
+        for source, frame, error in _iter_parallel(sources, workers):
+            yield source, _frame_chunks(frame, error)
+        return
+    
+    for source in sources:
+        yield source, source[1]
+
+
+def write_parsed_rows(sources, output_file, headers, header_row, stats, deduplicate=False,
+                      key_column=None, workers=1):
+    """
+    Combine parsed files into the output, realigning columns and deduplicating.
+    
+    A file that fails partway through is removed from the output again (the
+    file is truncated back to where that file's rows began) so the combined
+    CSV never holds part of a file reported as an error.
+    
+    Args:
+        sources: List of (csv_file, chunks, encoding, headers) tuples from read_csv_with_fallback
+        output_file: Path of the output CSV file
+        headers: Output column labels, as returned by read_csv_with_fallback
+        header_row: Column names written as the output header row
+        stats: Dictionary updated with 'files_processed' and 'total_rows' counts
+        deduplicate: Whether to remove duplicate rows
+        key_column: Column to deduplicate on, or None for all columns
+        workers: Number of processes used to parse files
+    
+    Returns:
+        int: Number of data rows written
+    """
+    seen = set()
+    rows_written = 0
+    
+    with open(output_file, 'w', newline='', encoding='utf-8',
+              buffering=OUTPUT_BUFFER_SIZE) as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(header_row)
+        
+        for (csv_file, _, used_encoding, file_headers), chunks in iter_file_chunks(sources, workers):
+            file_start = outfile.tell()
+            file_rows = 0
+            file_written = 0
+            file_digests = []
+            try:
+                for chunk in chunks:
+                    file_rows += len(chunk)
+                    if file_headers != headers:
+                        # Realign to the output header; missing columns become empty
+                        chunk = chunk.reindex(columns=headers, fill_value='')
+                    if deduplicate:
+                        digests = chunk_digests(chunk, key_column)
+                        mask = new_row_mask(digests, seen)
+                        file_digests.extend(digests[mask].tolist())
+                        chunk = chunk[mask]
+                    writer.writerows(chunk.itertuples(index=False, name=None))
+                    file_written += len(chunk)
+            except Exception as e:
+                # Drop the rows already written from this file
+                outfile.seek(file_start)
+                outfile.truncate()
+                seen.difference_update(file_digests)
+                print(f"[ERROR] Error reading {csv_file.name}: {e}")
+                continue
+            
+            rows_written += file_written
+            stats['total_rows'] += file_rows
+            encoding_info = f" (encoding: {used_encoding})" if used_encoding != 'utf-8' else ""
+            print(f"[OK] {csv_file.name} ({file_rows} rows){encoding_info}")
+            stats['files_processed'] += 1
     
-    return None, None, None
+    return rows_written
 
 
-def combine_csv_files(input_folder, output_file='combined.csv', deduplicate=False, key_column=None):
+def _sql_string(value):
+    """Quote a value as a DuckDB SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def combine_with_duckdb(csv_files, output_file, deduplicate=False, key_column=None):
+    """
+    Combine CSV files with a single DuckDB COPY statement.
+    
+    DuckDB scans the files in parallel and merges differing headers by name
+    (union_by_name), and deduplication runs as a multi-threaded hash
+    aggregate. Inputs must be UTF-8. Values are read as text, so they are
+    written back unchanged, but the output row order is not guaranteed when
+    deduplicating.
+    
+    Args:
+        csv_files: List of CSV file paths
+        output_file: Name of the output CSV file
+        deduplicate: Whether to remove duplicate rows
+        key_column: Column name to use for deduplication (uses all columns if not specified)
+    
+    Returns:
+        tuple: (success: bool, files_combined: int, total_rows: int)
+    """
+    try:
+        import duckdb
+    except ImportError:
+        print("[ERROR] duckdb is not installed. Install it with: pip install duckdb")
+        return False, 0, 0
+    
+    for csv_file in csv_files:
+        encoding = detect_encoding(csv_file)
+        if encoding not in VERBATIM_ENCODINGS:
+            print(f"[ERROR] {Path(csv_file).name} is not UTF-8 (detected: {encoding}); "
+                  f"use --engine python for this folder")
+            return False, 0, 0
+    
+    file_list = '[' + ', '.join(_sql_string(f) for f in csv_files) + ']'
+    source = f"read_csv({file_list}, header=true, all_varchar=true, union_by_name=true)"
+    
+    if deduplicate and key_column:
+        quoted_key = '"' + key_column.replace('"', '""') + '"'
+        query = f"SELECT * FROM {source} QUALIFY row_number() OVER (PARTITION BY {quoted_key}) = 1"
+    elif deduplicate:
+        query = f"SELECT DISTINCT * FROM {source}"
+    else:
+        query = f"SELECT * FROM {source}"
+    
+    con = duckdb.connect()
+    try:
+        if deduplicate and key_column:
+            columns = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+            if key_column not in columns:
+                print(f"[WARNING] Key column '{key_column}' not found, using all columns for deduplication")
+                query = f"SELECT DISTINCT * FROM {source}"
+        
+        total_rows = con.execute(f"SELECT count(*) FROM {source}").fetchone()[0]
+        rows_written = con.execute(
+            f"COPY ({query}) TO {_sql_string(output_file)} (FORMAT csv, HEADER true)"
+        ).fetchone()[0]
+    except Exception as e:
+        print(f"[ERROR] DuckDB combine failed: {e}")
+        return False, 0, 0
+    finally:
+        con.close()
+    
+    if deduplicate:
+        print(f"Removed {total_rows - rows_written} duplicate rows")
+        print(f"Final row count: {rows_written}")
+    
+    print("")
+    print("=" * 80)
+    print("[SUCCESS] Combination complete!")
+    print("=" * 80)
+    print(f"Files combined: {len(csv_files)}")
+    print(f"Total rows: {rows_written}")
+    print(f"Output file: {output_file}")
+    print(f"Location: {Path(output_file).absolute()}")
+    print("")
+    
+    return True, len(csv_files), rows_written
+
+
+def combine_csv_files(input_folder, output_file='combined.csv', deduplicate=False, key_column=None,
+                      workers=1, engine='python'):
     """
     Combine multiple CSV files into a single CSV file.
     
+    Files are streamed chunk by chunk straight into the output file, so memory
+    use does not grow with the total number of rows. With workers > 1, whole
+    files are parsed in parallel processes instead (faster, but up to about
+    `workers` whole files are held in memory at a time).
+    
     Args:
         input_folder: Path to the folder containing CSV files
         output_file: Name of the output CSV file (default: combined.csv)
         deduplicate: Whether to remove duplicate rows (default: False)
         key_column: Column name to use for deduplication (uses all columns if not specified)
+        workers: Number of processes used to parse files (default: 1)
+        engine: 'python' (default) or 'duckdb' to run the whole combine in DuckDB
     
     Returns:
         tuple: (success: bool, files_combined: int, total_rows: int)
@@ -86,8 +719,16 @@ def combine_csv_files(input_folder, output_file='combined.csv', deduplicate=Fals
             print(f"[ERROR] Path is not a folder: {input_folder}")
             return False, 0, 0
         
-        # Find all CSV files in the folder
-        csv_files = sorted(input_path.glob('*.csv'))
+        # Find all CSV files in the folder (scandir reuses the directory listing's
+        # file type instead of matching and stat'ing every entry like glob).
+        # Extension and order ignore case, as glob and path sorting do on Windows
+        with os.scandir(input_path) as entries:
+            csv_files = sorted(
+                (Path(entry.path) for entry in entries
+                 if entry.name.lower().endswith('.csv') and not entry.name.startswith('.')
+                 and entry.is_file()),
+                key=lambda p: p.name.lower()
+            )
         
         if not csv_files:
             print(f"[ERROR] No CSV files found in: {input_folder}")
@@ -96,6 +737,10 @@ def combine_csv_files(input_folder, output_file='combined.csv', deduplicate=Fals
         print(f"Input folder: {input_path.absolute()}")
         print(f"CSV files found: {len(csv_files)}")
         print(f"Output file: {output_file}")
+        if engine == 'duckdb':
+            print("Engine: DuckDB")
+        elif workers > 1:
+            print(f"Parallel parsing: {workers} worker processes")
         if deduplicate:
             print(f"Deduplication: Enabled" + (f" (key: {key_column})" if key_column else " (all columns)"))
         else:
@@ -106,43 +751,92 @@ def combine_csv_files(input_folder, output_file='combined.csv', deduplicate=Fals
         print("=" * 80)
         print("")
         
-        # Read all CSV files and combine
-        combined_rows = []
-        all_headers = set()
+        if engine == 'duckdb':
+            return combine_with_duckdb(csv_files, output_file, deduplicate, key_column)
+        
+        # First pass: open every file and collect headers only
+        sources = []
+        all_headers = None
         headers = None
-        files_processed = 0
-        total_rows = 0
+        header_mismatch = False
+        # Column label -> name as written in the files (see read_csv_with_fallback)
+        column_names = {}
         
         for csv_file in csv_files:
             try:
-                # Try to read file with encoding fallback
-                file_rows, file_headers, used_encoding = read_csv_with_fallback(csv_file)
+                # Try to open file with encoding fallback
+                chunks, file_headers, used_encoding, file_column_names = read_csv_with_fallback(csv_file)
                 
-                if file_rows is None:
+                if chunks is None:
                     print(f"[ERROR] Could not read {csv_file.name} (unsupported encoding)")
                     continue
                 
+                if not file_headers:
+                    print(f"[WARNING] Skipping {csv_file.name} (empty file or no header row)")
+                    continue
+                
                 # Get headers from first file
                 if headers is None:
                     headers = file_headers
-                    all_headers.update(headers)
-                else:
-                    # Track any additional headers from other files
-                    if file_headers:
-                        all_headers.update(file_headers)
-                
-                for row in file_rows:
-                    combined_rows.append(row)
-                    total_rows += 1
+                elif file_headers != headers:
+                    # Track any additional headers from other files; the union
+                    # is only built once a file's header differs from the first
+                    header_mismatch = True
+                    if all_headers is None:
+                        all_headers = set(headers)
+                    all_headers.update(file_headers)
                 
-                encoding_info = f" (encoding: {used_encoding})" if used_encoding != 'utf-8' else ""
-                print(f"[OK] {csv_file.name} ({len(file_rows)} rows){encoding_info}")
-                files_processed += 1
+                column_names.update(file_column_names)
+                sources.append((csv_file, chunks, used_encoding, file_headers))
                     
             except Exception as e:
                 print(f"[ERROR] Error reading {csv_file.name}: {e}")
                 continue
         
+        if not sources:
+            print("[ERROR] No CSV files were successfully processed")
+            return False, 0, 0
+        
+        # Keep the first file's column order and append any extra columns sorted
+        if header_mismatch and len(all_headers) > len(headers):
+            headers = list(headers) + sorted(all_headers - set(headers))
+        
+        if deduplicate and key_column and key_column not in headers:
+            print(f"[WARNING] Key column '{key_column}' not found, using all columns for deduplication")
+            key_column = None
+        
+        # Every file has exactly the output header unless one differed from the first
+        uniform = not header_mismatch
+        header_row = [column_names[h] for h in headers]
+        
+        # Second pass: stream rows straight into the output file
+        stats = {'files_processed': 0, 'total_rows': 0}
+        
+        # Identical UTF-8 files need no parsing unless deduplicating on a key column
+        verbatim = (
+            uniform and not key_column
+            and all(
+                used_encoding in VERBATIM_ENCODINGS
+                and read_raw_header(csv_file, used_encoding) == header_row
+                for csv_file, _, used_encoding, _ in sources
+            )
+        )
+        
+        if verbatim and deduplicate:
+            print("All files share the same header: deduplicating raw rows")
+            print("")
+            rows_written = concatenate_unique_records(sources, output_file, stats)
+        elif verbatim:
+            print("All files share the same header: copying rows verbatim")
+            print("")
+            rows_written = concatenate_files(sources, output_file, stats)
+        else:
+            rows_written = write_parsed_rows(sources, output_file, headers, header_row, stats,
+                                             deduplicate, key_column, workers)
+        
+        files_processed = stats['files_processed']
+        total_rows = stats['total_rows']
+        
         if files_processed == 0:
             print("[ERROR] No CSV files were successfully processed")
             return False, 0, 0
@@ -151,73 +845,24 @@ def combine_csv_files(input_folder, output_file='combined.csv', deduplicate=Fals
             print("[WARNING] No data rows found in any files")
             return True, files_processed, 0
         
-        # Use all discovered headers if we found more than the first file had
-        if len(all_headers) > len(headers or []):
-            headers = sorted(all_headers)
-        
-        # Deduplicate if requested
         if deduplicate:
             print("")
-            print("Deduplicating rows...")
-            
             if key_column:
-                # Deduplicate based on key column
-                if key_column not in headers:
-                    print(f"[WARNING] Key column '{key_column}' not found, using all columns for deduplication")
-                    seen = set()
-                    unique_rows = []
-                    for row in combined_rows:
-                        row_tuple = tuple(sorted(row.items()))
-                        if row_tuple not in seen:
-                            seen.add(row_tuple)
-                            unique_rows.append(row)
-                else:
-                    seen = set()
-                    unique_rows = []
-                    for row in combined_rows:
-                        key_value = row.get(key_column, '')
-                        if key_value not in seen:
-                            seen.add(key_value)
-                            unique_rows.append(row)
-                    print(f"[OK] Deduplicated based on '{key_column}' column")
-            else:
-                # Deduplicate based on all columns
-                seen = set()
-                unique_rows = []
-                for row in combined_rows:
-                    row_tuple = tuple(sorted(row.items()))
-                    if row_tuple not in seen:
-                        seen.add(row_tuple)
-                        unique_rows.append(row)
-            
-            removed_rows = total_rows - len(unique_rows)
-            print(f"Removed {removed_rows} duplicate rows")
-            combined_rows = unique_rows
-            print(f"Final row count: {len(combined_rows)}")
-        
-        # Write combined CSV file
-        print("")
-        print("Writing combined file...")
-        
-        # Ensure headers are clean (no None values)
-        headers = [h for h in headers if h is not None and h.strip()] if headers else []
-        
-        with open(output_file, 'w', newline='', encoding='utf-8') as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(combined_rows)
+                print(f"[OK] Deduplicated based on '{key_column}' column")
+            print(f"Removed {total_rows - rows_written} duplicate rows")
+            print(f"Final row count: {rows_written}")
         
         print("")
         print("=" * 80)
         print("[SUCCESS] Combination complete!")
         print("=" * 80)
         print(f"Files combined: {files_processed}")
-        print(f"Total rows: {len(combined_rows)}")
+        print(f"Total rows: {rows_written}")
         print(f"Output file: {output_file}")
         print(f"Location: {Path(output_file).absolute()}")
         print("")
         
-        return True, files_processed, len(combined_rows)
+        return True, files_processed, rows_written
         
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}")
@@ -236,6 +881,8 @@ Examples:
   python combine_csv_files.py my_splits --output combined.csv --deduplicate
   python combine_csv_files.py my_splits --output combined.csv --deduplicate --key "Employee ID"
   python combine_csv_files.py splits_folder --output final_report.csv
+  python combine_csv_files.py splits_folder --output final_report.csv --workers 4
+  python combine_csv_files.py splits_folder --output final_report.csv --deduplicate --engine duckdb
         """
     )
     
@@ -260,6 +907,18 @@ Examples:
         default=None,
         help='Column name to use as the key for deduplication (uses all columns if not specified)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of processes used to parse input files in parallel (default: 1, stream files one at a time)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['python', 'duckdb'],
+        default='python',
+        help='Combine engine (default: python). duckdb is faster on very large inputs but requires the duckdb package'
+    )
     
     args = parser.parse_args()
     
@@ -267,7 +926,9 @@ Examples:
         args.input_folder,
         output_file=args.output,
         deduplicate=args.deduplicate,
-        key_column=args.key
+        key_column=args.key,
+        workers=args.workers,
+        engine=args.engine
     )
     
     if success:
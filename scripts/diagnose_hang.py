@@ -1,19 +1,36 @@
 """
 Diagnostic script to identify where the ExportTimeEntries process is hanging.
 This tests each major step independently with timeout capabilities.
+
+Each step runs in its own child Python process (python diagnose_hang.py --step N)
+so a step that hangs inside COM can be killed by the OS instead of lingering and
+holding the database lock for the steps that follow.
+
+Access itself is started once: the parent keeps a shared instance running while
+steps 2-4 execute, and each child attaches to it instead of starting its own.
+When a step times out that instance is killed and a fresh one started, so the
+steps after it do not attach to a wedged Access.
 """
 
 import os
 import sys
-import time
 import signal
+import argparse
+import subprocess
 import traceback
 import yaml
-from threading import Thread
+from contextlib import contextmanager
 from datetime import datetime
 
+# libyaml's C loader parses config.yaml about 10x faster than the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 try:
     import win32com.client
+    import win32process
     import pythoncom
 except ImportError:
     print("ERROR: pywin32 is not installed.")
@@ -27,74 +44,242 @@ def load_config():
     config_path = os.path.join(project_root, 'config.yaml')
     
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=SafeLoader)
 
 
-def test_with_timeout(func, timeout=30, description=""):
-    """Run a function with a timeout."""
+def test_with_timeout(step, timeout=30, description="", config=None, shared=None):
+    """
+    Run a diagnostic step in a child process with a timeout.
+    
+    If the step times out and it was using the shared Access instance, that
+    instance is restarted: killing the child does not unstick the Access
+    process it was talking to.
+    """
     print(f"\n[TEST] {description}")
     print(f"       Timeout: {timeout} seconds")
     print(f"       Starting at {datetime.now().strftime('%H:%M:%S')}")
+    sys.stdout.flush()
     
-    result = {'completed': False, 'error': None}
+    command = [sys.executable, os.path.abspath(__file__), '--step', str(step)]
+    if config:
+        # Hand the parsed config to the child so it does not re-read config.yaml
+        command += [
+            '--db-path', config.get('path_to_access_db', ''),
+            '--start-date', config.get('start_date', ''),
+            '--end-date', config.get('end_date', ''),
+        ]
     
-    def target():
-        try:
-            func()
-            result['completed'] = True
-        except Exception as e:
-            result['error'] = str(e)
-            traceback.print_exc()
-    
-    thread = Thread(target=target, daemon=True)
-    thread.start()
-    thread.join(timeout=timeout)
-    
-    if thread.is_alive():
-        print(f"       ❌ TIMEOUT - Thread still running after {timeout}s")
+    try:
+        # subprocess.run kills the child if the timeout expires
+        result = subprocess.run(command, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f"       ❌ TIMEOUT - Step process killed after {timeout}s")
+        if shared is not None:
+            shared.restart()
         return False
-    elif result['completed']:
+    
+    if result.returncode == 0:
         print(f"       ✓ PASSED at {datetime.now().strftime('%H:%M:%S')}")
         return True
     else:
-        print(f"       ❌ FAILED: {result['error']}")
+        print(f"       ❌ FAILED: step exited with code {result.returncode}")
         return False
 
 
-def test_access_connection():
-    """Test basic Access application object creation."""
-    print("\n" + "="*70)
-    print("STEP 1: ACCESS APPLICATION CONNECTION")
-    print("="*70)
+def connect_access():
+    """Step 1: create and close the Access application object."""
+    pythoncom.CoInitialize()
+    try:
+        print("  Attempting to get active Access instance...")
+        try:
+            access = win32com.client.GetActiveObject("Access.Application")
+            print("  Found active Access instance")
+        except:
+            print("  No active Access instance, creating new one...")
+            access = win32com.client.Dispatch("Access.Application")
+            print("  New Access instance created")
+        
+        access.Quit()
+        print("  Access instance closed successfully")
+    finally:
+        pythoncom.CoUninitialize()
+
+
+class SharedAccessInstance:
+    """
+    One Access instance kept running in this (parent) process.
+    
+    Steps 2-4 run in child processes that attach to this instance with
+    GetActiveObject, so Access is started once for the whole diagnosis
+    instead of once per step. The instance's process id is recorded when it
+    starts, while Access still answers, so a wedged instance can be killed
+    without calling into it.
+    """
+    
+    def __init__(self):
+        self.access = None
+        self.pid = None
+    
+    def start(self):
+        print("\nStarting shared Access instance...")
+        self.access = win32com.client.Dispatch("Access.Application")
+        try:
+            _, self.pid = win32process.GetWindowThreadProcessId(self.access.hWndAccessApp())
+        except Exception:
+            self.pid = None
+    
+    def restart(self):
+        """Kill the (possibly wedged) instance and start a fresh one."""
+        # Quit() would block on a wedged instance; drop it and end the process
+        self.access = None
+        if self.pid is None:
+            print("       Could not find the shared Access process to kill; "
+                  "later steps may attach to a wedged instance")
+        else:
+            print(f"       Killing shared Access instance (PID {self.pid})...")
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self.start()
     
-    def connect():
-        pythoncom.CoInitialize()
+    def close(self):
+        if self.access is None:
+            return
+        print("\nClosing shared Access instance...")
         try:
-            print("  Attempting to get active Access instance...")
+            self.access.Quit()
+        except:
+            pass
+        self.access = None
+        self.pid = None
+
+
+@contextmanager
+def shared_access_instance():
+    """Keep a SharedAccessInstance running for the duration of the block."""
+    shared = SharedAccessInstance()
+    shared.start()
+    try:
+        yield shared
+    finally:
+        shared.close()
+
+
+@contextmanager
+def access_session(db_path):
+    """
+    Attach to the running Access instance and open the database in it.
+    
+    The database is closed on exit but Access is left running for the next step.
+    
+    Yields:
+        tuple: (access, db) - Access.Application and its CurrentDb()
+    """
+    pythoncom.CoInitialize()
+    try:
+        try:
+            access = win32com.client.GetActiveObject("Access.Application")
             try:
-                access = win32com.client.GetActiveObject("Access.Application")
-                print("  Found active Access instance")
+                access.CloseCurrentDatabase()
             except:
-                print("  No active Access instance, creating new one...")
-                access = win32com.client.Dispatch("Access.Application")
-                print("  New Access instance created")
-            
-            access.Quit()
-            print("  Access instance closed successfully")
+                pass
+        except:
+            access = win32com.client.Dispatch("Access.Application")
+        
+        print("  Opening database...")
+        access.OpenCurrentDatabase(db_path, False)
+        try:
+            yield access, access.CurrentDb()
         finally:
-            pythoncom.CoUninitialize()
+            access.CloseCurrentDatabase()
+    finally:
+        pythoncom.CoUninitialize()
+
+
+def open_access_database(access, db):
+    """Step 2: open and close the Access database."""
+    print("  Database opened successfully")
+    print("  Closing database...")
+
+
+def query_table(access, db):
+    """Step 3: query a small table from Access."""
+    # Test querying a small table
+    print("  Attempting to query tblClient table...")
+    sql = "SELECT TOP 5 * FROM [tblClient]"
+    rs = db.OpenRecordset(sql)
+    
+    print(f"  Table has {rs.RecordCount} total records (sampled first 5)")
+    
+    # GetRows fetches the sample in one COM call; the array is indexed [field][row]
+    data = rs.GetRows(5) if not rs.EOF else ()
+    row_count = len(data[0]) if data else 0
+    
+    print(f"  Successfully read {row_count} rows")
+    rs.Close()
+
+
+def query_large_table(access, db, start_date, end_date):
+    """Step 4: query the large tblClientBilling table with the configured date filter."""
+    # Build SQL with date filter
+    print("  Building SQL query with date filter...")
+    sql = f"""
+    SELECT TOP 100 * FROM [tblClientBilling]
+    WHERE [date] >= #{start_date}# AND [date] <= #{end_date}#
+    """
+    
+    print("  Executing query...")
+    rs = db.OpenRecordset(sql)
+    
+    print(f"  Query returned {rs.RecordCount} records (sampled first 100)")
     
-    return test_with_timeout(connect, timeout=15, 
+    data = rs.GetRows(100) if not rs.EOF else ()
+    row_count = len(data[0]) if data else 0
+    for i in range(10, row_count + 1, 10):
+        print(f"    Read {i} rows...")
+    
+    print(f"  Successfully read {row_count} rows")
+    rs.Close()
+
+
+def run_step(step, db_path, start_date, end_date):
+    """Child process entry point: run one step and report success via exit code."""
+    try:
+        if step == 1:
+            connect_access()
+        else:
+            with access_session(db_path) as (access, db):
+                if step == 2:
+                    open_access_database(access, db)
+                elif step == 3:
+                    query_table(access, db)
+                else:
+                    query_large_table(access, db, start_date, end_date)
+            if step == 2:
+                print("  Database closed successfully")
+        return 0
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def test_access_connection():
+    """Test basic Access application object creation."""
+    print("\n" + "="*70)
+    print("STEP 1: ACCESS APPLICATION CONNECTION")
+    print("="*70)
+    
+    return test_with_timeout(1, timeout=15,
                            description="Create and close Access application object")
 
 
-def test_access_database_open():
+def test_access_database_open(config, shared=None):
     """Test opening the Access database."""
     print("\n" + "="*70)
     print("STEP 2: OPEN ACCESS DATABASE")
     print("="*70)
     
-    config = load_config()
     db_path = config.get('path_to_access_db', '')
     
     if not os.path.exists(db_path):
@@ -104,160 +289,69 @@ def test_access_database_open():
     print(f"  Database path: {db_path}")
     print(f"  Database exists: {os.path.exists(db_path)}")
     
-    def open_db():
-        pythoncom.CoInitialize()
-        try:
-            try:
-                access = win32com.client.GetActiveObject("Access.Application")
-                try:
-                    access.CloseCurrentDatabase()
-                except:
-                    pass
-            except:
-                access = win32com.client.Dispatch("Access.Application")
-            
-            print("  Opening database...")
-            access.OpenCurrentDatabase(db_path, False)
-            print("  Database opened successfully")
-            
-            print("  Closing database...")
-            access.CloseCurrentDatabase()
-            print("  Database closed successfully")
-            
-            access.Quit()
-        finally:
-            pythoncom.CoUninitialize()
-    
-    return test_with_timeout(open_db, timeout=30,
-                           description="Open and close Access database")
+    return test_with_timeout(2, timeout=30,
+                           description="Open and close Access database",
+                           config=config, shared=shared)
 
 
-def test_table_query():
+def test_table_query(config, shared=None):
     """Test querying a table from Access."""
     print("\n" + "="*70)
     print("STEP 3: QUERY ACCESS TABLE")
     print("="*70)
     
-    config = load_config()
-    db_path = config.get('path_to_access_db', '')
-    
-    def query_table():
-        pythoncom.CoInitialize()
-        try:
-            try:
-                access = win32com.client.GetActiveObject("Access.Application")
-                try:
-                    access.CloseCurrentDatabase()
-                except:
-                    pass
-            except:
-                access = win32com.client.Dispatch("Access.Application")
-            
-            print("  Opening database...")
-            access.OpenCurrentDatabase(db_path, False)
-            
-            db = access.CurrentDb()
-            
-            # Test querying a small table
-            print("  Attempting to query tblClient table...")
-            sql = "SELECT TOP 5 * FROM [tblClient]"
-            rs = db.OpenRecordset(sql)
-            
-            print(f"  Table has {rs.RecordCount} total records (sampled first 5)")
-            
-            row_count = 0
-            rs.MoveFirst()
-            while not rs.EOF and row_count < 5:
-                row_count += 1
-                rs.MoveNext()
-            
-            print(f"  Successfully read {row_count} rows")
-            rs.Close()
-            
-            access.CloseCurrentDatabase()
-            access.Quit()
-        finally:
-            pythoncom.CoUninitialize()
-    
-    return test_with_timeout(query_table, timeout=30,
-                           description="Query tblClient table (5 rows)")
+    return test_with_timeout(3, timeout=30,
+                           description="Query tblClient table (5 rows)",
+                           config=config, shared=shared)
 
 
-def test_large_table_query():
+def test_large_table_query(config, shared=None):
     """Test querying the large tblClientBilling table."""
     print("\n" + "="*70)
     print("STEP 4: QUERY LARGE TABLE (tblClientBilling)")
     print("="*70)
     
-    config = load_config()
-    db_path = config.get('path_to_access_db', '')
     start_date = config.get('start_date', '')
     end_date = config.get('end_date', '')
     
     print(f"  Date range: {start_date} to {end_date}")
     
-    def query_large_table():
-        pythoncom.CoInitialize()
-        try:
-            try:
-                access = win32com.client.GetActiveObject("Access.Application")
-                try:
-                    access.CloseCurrentDatabase()
-                except:
-                    pass
-            except:
-                access = win32com.client.Dispatch("Access.Application")
-            
-            print("  Opening database...")
-            access.OpenCurrentDatabase(db_path, False)
-            
-            db = access.CurrentDb()
-            
-            # Build SQL with date filter
-            print("  Building SQL query with date filter...")
-            sql = f"""
-            SELECT TOP 100 * FROM [tblClientBilling]
-            WHERE [date] >= #{start_date}# AND [date] <= #{end_date}#
-            """
-            
-            print("  Executing query...")
-            rs = db.OpenRecordset(sql)
-            
-            print(f"  Query returned {rs.RecordCount} records (sampled first 100)")
-            
-            row_count = 0
-            rs.MoveFirst()
-            while not rs.EOF and row_count < 100:
-                row_count += 1
-                if row_count % 10 == 0:
-                    print(f"    Read {row_count} rows...")
-                rs.MoveNext()
-            
-            print(f"  Successfully read {row_count} rows")
-            rs.Close()
-            
-            access.CloseCurrentDatabase()
-            access.Quit()
-        finally:
-            pythoncom.CoUninitialize()
-    
-    return test_with_timeout(query_large_table, timeout=60,
-                           description="Query tblClientBilling (with date filter, sample 100 rows)")
+    return test_with_timeout(4, timeout=60,
+                           description="Query tblClientBilling (with date filter, sample 100 rows)",
+                           config=config, shared=shared)
 
 
 def main():
     """Run all diagnostic tests."""
+    parser = argparse.ArgumentParser(description='Diagnose where the ExportTimeEntries process hangs.')
+    parser.add_argument(
+        '--step',
+        type=int,
+        choices=[1, 2, 3, 4],
+        help='Run a single step in this process (used internally for timeout isolation)'
+    )
+    parser.add_argument('--db-path', help=argparse.SUPPRESS)
+    parser.add_argument('--start-date', help=argparse.SUPPRESS)
+    parser.add_argument('--end-date', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.step is not None:
+        return run_step(args.step, args.db_path, args.start_date, args.end_date)
+    
     print("\n")
     print("╔" + "="*68 + "╗")
     print("║" + " "*15 + "TIMEKEEPING MIGRATOR HANG DIAGNOSIS" + " "*19 + "║")
     print("╚" + "="*68 + "╝")
     
+    config = load_config()
     results = {}
     
     results['step1_access'] = test_access_connection()
-    results['step2_database'] = test_access_database_open()
-    results['step3_table'] = test_table_query()
-    results['step4_large'] = test_large_table_query()
+    
+    with shared_access_instance() as shared:
+        results['step2_database'] = test_access_database_open(config, shared)
+        results['step3_table'] = test_table_query(config, shared)
+        results['step4_large'] = test_large_table_query(config, shared)
     
     # Summary
     print("\n" + "="*70)
@@ -6,143 +6,633 @@ Supports filtering by date range.
 """
 
 import os
+import re
 import sys
+import csv
+import atexit
 import datetime
-import pandas as pd
 import argparse
+import xlsxwriter
+
+from background_writer import BackgroundWriter
 
 # Configuration
 ACCESS_DB = r"C:\testData\AGE-Projects_be.accdb"
 TABLE_NAME = "tblClientBilling"
 DATE_FIELD = "date"  # Name of the date field in the table
+# --start-date/--end-date shapes: YYYY-MM-DD, or MM-DD-YYYY / MM/DD/YYYY
+# (read as DD-MM-YYYY / DD/MM/YYYY when the first number cannot be a month)
+DATE_ARGUMENT_PATTERN = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})|(\d{1,2})([-/])(\d{1,2})\5(\d{4})")
+GETROWS_CHUNK_SIZE = 10000  # Rows fetched per Recordset.GetRows call
+XLSX_MAX_ROWS = 1048576  # Rows per worksheet allowed by Excel (including the header)
+MAX_ROWS_PER_SHEET = 1000000  # Default data rows per sheet before starting the next one
+WRITE_QUEUE_SIZE = 2  # GetRows chunks buffered between the reader and the writer thread
+
+
+# DAO engines tried before falling back to the Access application (ACE, then Jet)
+DB_ENGINE_PROGIDS = ["DAO.DBEngine.120", "DAO.DBEngine.36"]
+DB_FAIL_ON_ERROR = 128  # dbFailOnError: roll back the statement if any row fails
+DB_OPEN_SNAPSHOT = 4  # dbOpenSnapshot: static, read-only recordset
+DB_OPEN_FORWARD_ONLY = 8  # dbOpenForwardOnly: no bookmarks, can only scroll forward
+DB_READ_ONLY = 4  # dbReadOnly: no edit buffers or locks
+DB_DATE = 8  # Field.Type of Date/Time columns
+DB_TEXT = 10  # Field.Type of Short Text columns
+DB_MEMO = 12  # Field.Type of Long Text (Memo) columns
+RECORDSET_CACHE_SIZE = 500  # Records Jet prefetches per round trip
 
+# DAO type libraries for early binding: ACE DAO (Access 2007+), then DAO 3.6
+DAO_TYPELIBS = [
+    ('{4AC9E1DA-5BAD-4AC7-86E3-24F4CDCECA28}', 0, 12, 0),
+    ('{00025E01-0000-0000-C000-000000000046}', 0, 5, 0),
+]
 
-def export_table_to_excel_via_com(db_path, table_name, output_path, date_field=None, start_date=None, end_date=None):
+
+def get_access_application():
     """
-    Export table contents to Excel file using COM/pywin32.
+    Get the running Access instance or start a new one, early-bound where possible.
+    
+    gencache generates typed wrappers for Access and DAO so property and method
+    calls go straight through the vtable instead of late-bound IDispatch name
+    lookups. Falls back to a late-bound object if the wrappers cannot be built.
     
-    Args:
-        db_path: Path to the Access database file
-        table_name: Name of the table to export
-        output_path: Path where Excel file will be saved
-        date_field: Name of the date field for filtering (optional)
-        start_date: Start date for filtering (optional)
-        end_date: End date for filtering (optional)
-        
     Returns:
-        Number of rows exported
+        Access.Application COM object with no database open
     """
     try:
         import win32com.client
+        from win32com.client import gencache
     except ImportError:
         print("ERROR: pywin32 is not installed.")
         print("Install it with: pip install pywin32")
         sys.exit(1)
     
-    # Try to get existing Access instance or create new one
+    for typelib in DAO_TYPELIBS:
+        try:
+            gencache.EnsureModule(*typelib)
+            break
+        except Exception:
+            continue
+    
+    # Try to get existing Access instance (e.g. one left open by --keep-access-open) or create new one
     try:
         access = win32com.client.GetActiveObject("Access.Application")
+        print("  Reusing running Access instance")
         # Close any open database
         try:
             access.CloseCurrentDatabase()
         except:
             pass
     except:
+        print("  Starting Access...")
         access = win32com.client.Dispatch("Access.Application")
     
     try:
-        # Open the database in shared mode (False = not exclusive)
-        print(f"  Opening database...")
-        access.OpenCurrentDatabase(db_path, False)
-        print(f"  Database opened successfully")
+        return gencache.EnsureDispatch(access)
+    except Exception:
+        return access
+
+
+def open_database(db_path, exclusive=False, read_only=False):
+    """
+    Open an Access database through the DAO engine without starting Access.
+    
+    DAO.DBEngine is a plain data-access component: no MSACCESS.EXE process,
+    no UI thread and no add-ins. Access.Application is only used when no DAO
+    engine is registered.
+    
+    Args:
+        db_path: Path to the Access database file
+        exclusive: Open the database exclusively
+        read_only: Open the database read-only
+        
+    Returns:
+        tuple: (db, workspace, access) - DAO Database, the default Workspace
+        it was opened in (used for transactions), and the Access.Application
+        that opened it (None when DAO was used directly)
+    """
+    try:
+        import win32com.client
+        from win32com.client import gencache
+    except ImportError:
+        print("ERROR: pywin32 is not installed.")
+        print("Install it with: pip install pywin32")
+        sys.exit(1)
+    
+    for progid in DB_ENGINE_PROGIDS:
+        try:
+            engine = win32com.client.Dispatch(progid)
+        except Exception:
+            continue
+        try:
+            engine = gencache.EnsureDispatch(engine)
+        except Exception:
+            pass
+        workspace = engine.Workspaces(0)
+        return workspace.OpenDatabase(db_path, exclusive, read_only), workspace, None
+    
+    print("  DAO engine not available, falling back to Access.Application")
+    access = get_access_application()
+    access.OpenCurrentDatabase(db_path, exclusive)
+    return access.CurrentDb(), access.DBEngine.Workspaces(0), access
+
+
+def close_database(db, access=None, quit_access=True):
+    """
+    Close a database opened by open_database.
+    
+    Args:
+        db: DAO Database to close
+        access: Access.Application that opened it (None when DAO was used directly)
+        quit_access: Quit Access as well; when False only the database is
+            closed and the instance is left running for the next run to reuse
+    """
+    try:
+        db.Close()
+    except:
+        pass
+    if access is not None:
+        try:
+            access.CloseCurrentDatabase()
+        except:
+            pass
+        if quit_access:
+            try:
+                access.Quit()
+            except:
+                pass
+
+
+def open_xlsx_writer(output_path):
+    """
+    Create a streaming XLSX workbook.
+    
+    Rows must then be written in order with worksheet.write_row. Datetimes
+    are written with their timezone removed (pywintypes dates carry one),
+    and strings are never turned into formulas or hyperlinks.
+    
+    Args:
+        output_path: Path where the Excel file will be saved
+        
+    Returns:
+        xlsxwriter.Workbook
+    """
+    return xlsxwriter.Workbook(output_path, {
+        'constant_memory': True,
+        'remove_timezone': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+
+
+class XlsxSink:
+    """
+    Write GetRows chunks to a streaming (constant_memory) XLSX workbook.
+    
+    A sheet holds at most max_rows_per_sheet data rows; further rows go to
+    Sheet2, Sheet3, ..., each with its own header row, so exports beyond
+    Excel's 1,048,576-row limit are split instead of failing.
+    """
+    
+    def __init__(self, output_path, columns, field_types, max_rows_per_sheet=MAX_ROWS_PER_SHEET):
+        self.workbook = open_xlsx_writer(output_path)
+        self.columns = columns
+        self.header_format = self.workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        self.max_rows_per_sheet = max_rows_per_sheet
+        self.sheet_count = 0
+        self._add_sheet()
+    
+    def _add_sheet(self):
+        """Start a new worksheet and write its header row."""
+        self.worksheet = self.workbook.add_worksheet()
+        self.worksheet.write_row(0, 0, self.columns, self.header_format)
+        self.next_row = 1
+        self.sheet_count += 1
+    
+    def write(self, chunk):
+        """Write one column-major GetRows chunk."""
+        for row in zip(*chunk):
+            if self.next_row > self.max_rows_per_sheet:
+                self._add_sheet()
+            self.worksheet.write_row(self.next_row, 0, row)
+            self.next_row += 1
+    
+    def close(self):
+        if self.sheet_count > 1:
+            print(f"  Rows were split across {self.sheet_count} sheets")
+        self.workbook.close()
+
+
+class CsvSink:
+    """Write GetRows chunks straight to a UTF-8 CSV file."""
+    
+    def __init__(self, output_path, columns, field_types):
+        self.file = open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+        # Only Date/Time columns need converting; find them once from the field types
+        self.date_columns = [i for i, field_type in enumerate(field_types) if field_type == DB_DATE]
+    
+    def write(self, chunk):
+        """Write one column-major GetRows chunk."""
+        chunk = list(chunk)
+        # pywintypes dates carry a timezone; write them as plain local timestamps
+        for i in self.date_columns:
+            chunk[i] = [None if value is None else value.replace(tzinfo=None) for value in chunk[i]]
+        self.writer.writerows(zip(*chunk))
+    
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Write GetRows chunks to a Parquet file (requires pyarrow)."""
+    
+    def __init__(self, output_path, columns, field_types):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("ERROR: pyarrow is not installed (required for --format parquet).")
+            print("Install it with: pip install pyarrow")
+            sys.exit(1)
+        
+        # Column types come from the DAO field types, so every chunk shares one schema
+        # even when a column is entirely empty in some chunks
+        dao_types = {
+            1: pa.bool_(), 2: pa.uint8(), 3: pa.int16(), 4: pa.int32(),
+            5: pa.decimal128(19, 4), 6: pa.float32(), 7: pa.float64(),
+            8: pa.timestamp('us'), 9: pa.binary(), 11: pa.binary(), 16: pa.int64(),
+        }
+        self.pa = pa
+        self.schema = pa.schema([(name, dao_types.get(field_type, pa.string()))
+                                 for name, field_type in zip(columns, field_types)])
+        # Text and Memo columns already arrive as str; only other unmapped types
+        # (GUIDs, etc.) need stringifying before they fit a string column
+        self.stringify = {i for i, field_type in enumerate(field_types)
+                          if field_type not in dao_types and field_type not in (DB_TEXT, DB_MEMO)}
+        self.writer = pq.ParquetWriter(output_path, self.schema)
+    
+    def write(self, chunk):
+        """Write one column-major GetRows chunk as a row group."""
+        # GetRows chunks are already one sequence per column, so each becomes
+        # an Arrow array directly without building any per-row objects
+        arrays = []
+        for i, (values, field) in enumerate(zip(chunk, self.schema)):
+            if i in self.stringify:
+                values = [None if value is None else str(value) for value in values]
+            arrays.append(self.pa.array(values, type=field.type))
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+
+OUTPUT_SINKS = {'xlsx': XlsxSink, 'csv': CsvSink, 'parquet': ParquetSink}
+
+
+def open_output(output_path, columns, field_types, max_rows_per_sheet=MAX_ROWS_PER_SHEET):
+    """
+    Open the writer for output_path, chosen by its extension (.xlsx, .csv or .parquet).
+    
+    Args:
+        output_path: Path where the export will be saved
+        columns: List of column names
+        field_types: DAO Field.Type of each column
+        max_rows_per_sheet: Data rows per worksheet (XLSX only)
+        
+    Returns:
+        Sink object with write(chunk) and close() methods
+    """
+    extension = os.path.splitext(output_path)[1].lstrip('.').lower()
+    sink_class = OUTPUT_SINKS.get(extension, XlsxSink)
+    if sink_class is XlsxSink:
+        return XlsxSink(output_path, columns, field_types, max_rows_per_sheet)
+    return sink_class(output_path, columns, field_types)
+
+
+class AccessSession:
+    """
+    Keep one database connection open for a whole run (export, prompt and delete).
+    
+    Opening the database (and starting Access, if DAO is unavailable) happens
+    once instead of once per operation, and the temporary QueryDefs built for
+    the run are kept in session.queries so each statement is compiled once.
+    
+    With keep_access_open, an Access instance used as the fallback is left
+    running on close so the next run attaches to it with a warm cache. The
+    session is also closed at interpreter exit if it was never closed.
+    
+    Usage:
+        with AccessSession(ACCESS_DB) as session:
+            export_table_to_excel_via_com(session.db, TABLE_NAME, output_file,
+                                          queries=session.queries)
+    """
+    
+    def __init__(self, db_path, exclusive=False, read_only=False, keep_access_open=False):
+        self.db_path = db_path
+        self.exclusive = exclusive
+        self.read_only = read_only
+        self.keep_access_open = keep_access_open
+        self.db = None
+        self.workspace = None
+        self.access = None
+        self.queries = {}
+    
+    def open(self):
+        """Open the database if it is not open yet."""
+        if self.db is None:
+            print(f"  Opening database...")
+            self.db, self.workspace, self.access = open_database(self.db_path, self.exclusive, self.read_only)
+            atexit.register(self.close)
+            print(f"  Database opened successfully")
+        return self
+    
+    def close(self):
+        """Close the database (and Access, if it was started)."""
+        if self.db is not None:
+            for query in self.queries.values():
+                try:
+                    query.Close()
+                except:
+                    pass
+            self.queries.clear()
+            close_database(self.db, self.access, quit_access=not self.keep_access_open)
+            if self.access is not None and self.keep_access_open:
+                print("  Leaving Access running for the next run (--keep-access-open)")
+            atexit.unregister(self.close)
+            self.db = None
+            self.workspace = None
+            self.access = None
+    
+    def __enter__(self):
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def parse_date(value):
+    """
+    Parse a YYYY-MM-DD, MM/DD/YYYY or DD/MM/YYYY date string in a single pass.
+    
+    The shape is checked with DATE_ARGUMENT_PATTERN, so the year must have four
+    digits: "1/1/24" is rejected rather than read as the year 24, which would
+    widen a --delete date range to the whole table. A slash (or MM-DD-YYYY)
+    date is read as MM/DD/YYYY unless its first part cannot be a month, in
+    which case it is read as DD/MM/YYYY.
+    
+    Args:
+        value: Date string
+        
+    Returns:
+        datetime.datetime: Midnight on the parsed date
+        
+    Raises:
+        ValueError: If the string is not a valid date in one of these formats
+    """
+    match = DATE_ARGUMENT_PATTERN.fullmatch(value.strip())
+    if not match:
+        raise ValueError(f"Could not parse date: {value}")
+    
+    if match.group(1):
+        year, month, day = match.group(1, 2, 3)
+    else:
+        month, day, year = match.group(4, 6, 7)
+        if int(month) > 12:
+            month, day = day, month
+    
+    try:
+        return datetime.datetime(int(year), int(month), int(day))
+    except ValueError as e:
+        raise ValueError(f"Invalid date {value}: {e}") from None
+
+
+def format_date(value):
+    """Format a date the way Access displays it (MM/DD/YYYY)."""
+    return value.strftime('%m/%d/%Y')
+
+
+def build_filtered_sql(statement, table_name, date_field=None, start_date=None, end_date=None):
+    """
+    Build a statement against table_name with an optional parameterized date filter.
+    
+    The dates are not formatted into the SQL text; they are declared as DateTime
+    parameters and bound by create_query, so Jet compares native dates (and can
+    use an index on date_field) instead of coercing #MM/DD/YYYY# literals.
+    
+    Args:
+        statement: Statement head, e.g. "SELECT *" or "DELETE *"
+        table_name: Name of the table
+        date_field: Name of the date field for filtering (optional)
+        start_date: Start datetime, inclusive (optional)
+        end_date: End datetime, inclusive (optional)
+        
+    Returns:
+        tuple: (sql: str, params: dict of parameter name -> datetime)
+    """
+    conditions = []
+    params = {}
+    if date_field and start_date:
+        conditions.append(f"[{date_field}] >= [pStart]")
+        params['pStart'] = start_date
+    if date_field and end_date:
+        conditions.append(f"[{date_field}] <= [pEnd]")
+        params['pEnd'] = end_date
+    
+    sql = f"{statement} FROM [{table_name}]"
+    if conditions:
+        declarations = ', '.join(f"[{name}] DateTime" for name in params)
+        sql = f"PARAMETERS {declarations}; {sql} WHERE {' AND '.join(conditions)}"
+    return sql, params
+
+
+def create_query(db, sql, params, queries=None):
+    """
+    Create a temporary QueryDef for sql and bind its parameters.
+    
+    Args:
+        db: Open DAO Database
+        sql: Statement text (see build_filtered_sql)
+        params: Dict of parameter name -> value
+        queries: Optional dict of sql -> QueryDef; a QueryDef already compiled
+            for sql is reused and only its parameters are rebound
+        
+    Returns:
+        DAO QueryDef
+    """
+    query = queries.get(sql) if queries is not None else None
+    if query is None:
+        query = db.CreateQueryDef("", sql)
+        if queries is not None:
+            queries[sql] = query
+    for name, value in params.items():
+        query.Parameters(name).Value = value
+    return query
+
+
+def count_rows(db, table_name, date_field=None, start_date=None, end_date=None, queries=None):
+    """
+    Count the rows matching the optional date filter.
+    
+    A COUNT(*) lets Jet answer from the date-field index (when there is one)
+    without materializing any rows, so an empty filter is detected cheaply.
+    
+    Args:
+        db: Open DAO Database
+        table_name: Name of the table
+        date_field: Name of the date field for filtering (optional)
+        start_date: Start datetime, inclusive (optional)
+        end_date: End datetime, inclusive (optional)
+        queries: Compiled QueryDef cache to reuse (optional, see AccessSession)
+        
+    Returns:
+        int: Number of matching rows
+    """
+    sql, params = build_filtered_sql("SELECT COUNT(*)", table_name, date_field, start_date, end_date)
+    rs = create_query(db, sql, params, queries).OpenRecordset(DB_OPEN_SNAPSHOT)
+    try:
+        return int(rs.Fields(0).Value or 0)
+    finally:
+        rs.Close()
+
+
+def get_columns(db, table_name):
+    """
+    Read a table's column names and DAO field types without fetching any rows.
+    
+    Args:
+        db: Open DAO Database
+        table_name: Name of the table
         
+    Returns:
+        tuple: (columns: list of str, field_types: list of int)
+    """
+    rs = db.OpenRecordset(f"SELECT TOP 0 * FROM [{table_name}]", DB_OPEN_SNAPSHOT)
+    try:
+        # Look each Field up once; every .Item() call is a COM round trip
+        fields = [rs.Fields.Item(i) for i in range(rs.Fields.Count)]
+        columns = [field.Name for field in fields]
+        field_types = [field.Type for field in fields]
+    finally:
+        rs.Close()
+    return columns, field_types
+
+
+def export_table_to_excel_via_com(db, table_name, output_path, date_field=None, start_date=None, end_date=None,
+                                  queries=None, max_rows_per_sheet=MAX_ROWS_PER_SHEET):
+    """
+    Export table contents to an Excel, CSV or Parquet file using COM/pywin32.
+    
+    The output format follows the extension of output_path.
+    
+    Args:
+        db: Open DAO Database (see AccessSession)
+        table_name: Name of the table to export
+        output_path: Path where the .xlsx, .csv or .parquet file will be saved
+        date_field: Name of the date field for filtering (optional)
+        start_date: Start datetime for filtering (optional)
+        end_date: End datetime for filtering (optional)
+        queries: Compiled QueryDef cache to reuse (optional, see AccessSession)
+        max_rows_per_sheet: Data rows per worksheet before an XLSX export
+            continues on a new sheet
+        
+    Returns:
+        Number of rows exported
+    """
+    try:
         # Build SQL query with optional date filter
+        sql, params = build_filtered_sql("SELECT *", table_name, date_field, start_date, end_date)
         if date_field and start_date and end_date:
-            sql = f"SELECT * FROM [{table_name}] WHERE [{date_field}] >= #{start_date}# AND [{date_field}] <= #{end_date}#"
-            print(f"  Filtering: {date_field} between {start_date} and {end_date}")
+            print(f"  Filtering: {date_field} between {format_date(start_date)} and {format_date(end_date)}")
         elif date_field and start_date:
-            sql = f"SELECT * FROM [{table_name}] WHERE [{date_field}] >= #{start_date}#"
-            print(f"  Filtering: {date_field} >= {start_date}")
+            print(f"  Filtering: {date_field} >= {format_date(start_date)}")
         elif date_field and end_date:
-            sql = f"SELECT * FROM [{table_name}] WHERE [{date_field}] <= #{end_date}#"
-            print(f"  Filtering: {date_field} <= {end_date}")
+            print(f"  Filtering: {date_field} <= {format_date(end_date)}")
         else:
-            sql = f"SELECT * FROM [{table_name}]"
             print(f"  Exporting all records")
         
-        # Execute query
-        print(f"  Executing SQL query...")
-        print(f"  SQL: {sql}")
-        db = access.CurrentDb()
-        rs = db.OpenRecordset(sql)
-        print(f"  Recordset opened successfully")
-        
-        # Get field names
+        # Get field names before running the (possibly slow) filtered query
         print(f"  Reading field names...")
-        field_count = rs.Fields.Count
-        columns = [rs.Fields.Item(i).Name for i in range(field_count)]
-        print(f"  Found {field_count} fields: {', '.join(columns)}")
+        columns, field_types = get_columns(db, table_name)
+        print(f"  Found {len(columns)} fields: {', '.join(columns)}")
         
-        # Check if recordset is empty
-        if rs.EOF and rs.BOF:
+        # Skip the SELECT entirely when nothing matches; the output still gets its header row
+        expected_rows = count_rows(db, table_name, date_field, start_date, end_date, queries)
+        print(f"  Matching records: {expected_rows}")
+        if not expected_rows:
             print(f"  No records found matching the criteria")
-            rs.Close()
-            # Create empty DataFrame with columns
-            df = pd.DataFrame(columns=columns)
-            df.to_excel(output_path, index=False, engine='openpyxl')
+            open_output(output_path, columns, field_types, max_rows_per_sheet).close()
             return 0
         
-        # Get all data using GetRows (much faster than iterating)
-        print(f"  Reading all data...")
-        rs.MoveFirst()
+        # Execute query
+        print(f"  Executing SQL query...")
+        print(f"  SQL: {sql}")
+        # Forward-only and read-only: Jet keeps no bookmarks or edit buffers,
+        # which is all a single front-to-back GetRows pass needs
+        rs = create_query(db, sql, params, queries).OpenRecordset(DB_OPEN_FORWARD_ONLY, DB_READ_ONLY)
+        try:
+            rs.CacheSize = RECORDSET_CACHE_SIZE
+        except Exception:
+            # CacheSize only applies to some recordset/backend types
+            pass
+        print(f"  Recordset opened successfully")
         
-        # DAO GetRows() doesn't work well for large datasets, use row-by-row
-        data = []
-        row_count = 0
+        # Stream rows to the output as they are fetched, so memory use does not
+        # grow with the table (XLSX uses xlsxwriter's constant_memory mode).
+        # Encoding runs on a writer thread while the next chunk is fetched.
+        sink = BackgroundWriter(open_output(output_path, columns, field_types, max_rows_per_sheet),
+                                WRITE_QUEUE_SIZE)
         
-        while not rs.EOF:
-            row = []
-            for col_idx in range(field_count):
-                try:
-                    value = rs.Fields.Item(col_idx).Value
-                    row.append(value)
-                except:
-                    row.append(None)
-            data.append(row)
-            row_count += 1
+        try:
+            # Check if recordset is empty
+            if rs.EOF and rs.BOF:
+                print(f"  No records found matching the criteria")
+                rs.Close()
+                return 0
             
-            if row_count % 1000 == 0:
-                print(f"  Read {row_count} rows...", end='\r')
+            # Read data using GetRows in chunks (one COM call per chunk, not per cell)
+            # (a forward-only recordset is already on its first record)
+            print(f"  Reading and writing data...")
             
-            rs.MoveNext()
-        
-        if row_count >= 1000:
-            print(f"  Read {row_count} rows... Done!")
-        else:
-            print(f"  Read {row_count} rows total")
-        
-        print(f"  Closing recordset...")
-        rs.Close()
-        
-        # Convert pywintypes datetime objects to regular Python datetime before creating DataFrame
-        print(f"  Converting datetime objects...")
-        import pywintypes
-        import datetime as dt
-        
-        for row in data:
-            for i in range(len(row)):
-                if isinstance(row[i], pywintypes.TimeType):
-                    # Convert to Python datetime
-                    row[i] = dt.datetime(row[i].year, row[i].month, row[i].day,
-                                        row[i].hour, row[i].minute, row[i].second)
-        
-        # Create DataFrame and export
-        df = pd.DataFrame(data, columns=columns)
-        
-        print(f"  Writing to Excel file...")
-        df.to_excel(output_path, index=False, engine='openpyxl')
+            row_count = 0
+            # Progress is redrawn in place once per chunk, and only on a terminal
+            show_progress = sys.stdout.isatty()
+            
+            # GetRows is only called while rows remain, so any error it raises is a
+            # real read failure and propagates instead of truncating the output
+            while not rs.EOF:
+                chunk = rs.GetRows(GETROWS_CHUNK_SIZE)
+                
+                # GetRows returns fields x rows
+                chunk_rows = len(chunk[0]) if chunk else 0
+                if not chunk_rows:
+                    break
+                sink.write(chunk)
+                row_count += chunk_rows
+                
+                if show_progress:
+                    sys.stdout.write(f"  Read {row_count} of {expected_rows} rows...\r")
+                    sys.stdout.flush()
+            
+            if row_count >= 1000:
+                print(f"  Read {row_count} rows... Done!")
+            else:
+                print(f"  Read {row_count} rows total")
+            
+            # The database is opened shared, so other users may change it between the count and the read
+            if row_count != expected_rows:
+                print(f"  WARNING: {expected_rows} rows matched when counted but {row_count} were read "
+                      f"(the table changed during the export)")
+            
+            print(f"  Closing recordset...")
+            rs.Close()
+        finally:
+            print(f"  Writing output file...")
+            sink.close()
         
-        return len(df)
+        return row_count
         
     except Exception as e:
         # Try to clean up on error
@@ -152,71 +642,53 @@ def export_table_to_excel_via_com(db_path, table_name, output_path, date_field=N
         except:
             pass
         raise e
-    finally:
-        try:
-            access.CloseCurrentDatabase()
-        except:
-            pass
-        try:
-            access.Quit()
-        except:
-            pass
 
 
-def empty_table_via_com(db_path, table_name, date_field=None, start_date=None, end_date=None):
+def empty_table_via_com(db, table_name, date_field=None, start_date=None, end_date=None, workspace=None,
+                        queries=None):
     """
     Delete records from the specified table using COM.
     
+    When a workspace is given the DELETE runs inside a transaction on it, so
+    the delete either commits as a whole or is rolled back. The database
+    should be open exclusively: in shared mode Jet locks every deleted record
+    until the commit, and a large delete fails with MaxLocksPerFile (error 3052).
+    
     Args:
-        db_path: Path to the Access database file
+        db: Open DAO Database (see AccessSession)
         table_name: Name of the table to empty
         date_field: Name of the date field for filtering (optional)
-        start_date: Start date for filtering (optional)
-        end_date: End date for filtering (optional)
+        start_date: Start datetime for filtering (optional)
+        end_date: End datetime for filtering (optional)
+        workspace: DAO Workspace the database was opened in (optional)
+        queries: Compiled QueryDef cache to reuse (optional, see AccessSession)
         
     Returns:
         Success status
     """
-    try:
-        import win32com.client
-    except ImportError:
-        print("ERROR: pywin32 is not installed.")
-        print("Install it with: pip install pywin32")
-        sys.exit(1)
+    # Nothing to delete: skip the DELETE (and its transaction) altogether
+    if not count_rows(db, table_name, date_field, start_date, end_date, queries):
+        print(f"  No records found matching the criteria")
+        return True
     
-    # Try to get existing Access instance or create new one
-    try:
-        access = win32com.client.GetActiveObject("Access.Application")
-        # Close any open database
-        try:
-            access.CloseCurrentDatabase()
-        except:
-            pass
-    except:
-        access = win32com.client.Dispatch("Access.Application")
+    # Build DELETE query with optional date filter
+    sql, params = build_filtered_sql("DELETE *", table_name, date_field, start_date, end_date)
     
-    try:
-        # Open the database
-        access.OpenCurrentDatabase(db_path, True)  # True = exclusive mode
-        
-        # Build DELETE query with optional date filter
-        if date_field and start_date and end_date:
-            sql = f"DELETE FROM [{table_name}] WHERE [{date_field}] >= #{start_date}# AND [{date_field}] <= #{end_date}#"
-        elif date_field and start_date:
-            sql = f"DELETE FROM [{table_name}] WHERE [{date_field}] >= #{start_date}#"
-        elif date_field and end_date:
-            sql = f"DELETE FROM [{table_name}] WHERE [{date_field}] <= #{end_date}#"
-        else:
-            sql = f"DELETE * FROM [{table_name}]"
-        
-        # Execute DELETE query
-        access.DoCmd.RunSQL(sql)
-        
+    # Execute DELETE query (no confirmation dialogs, unlike DoCmd.RunSQL)
+    query = create_query(db, sql, params, queries)
+    if workspace is None:
+        query.Execute(DB_FAIL_ON_ERROR)
         return True
-        
-    finally:
-        access.CloseCurrentDatabase()
-        access.Quit()
+    
+    workspace.BeginTrans()
+    try:
+        query.Execute(DB_FAIL_ON_ERROR)
+        workspace.CommitTrans()
+    except Exception:
+        workspace.Rollback()
+        raise
+    
+    return True
 
 
 def main():
@@ -244,6 +716,9 @@ Examples:
   
   # Use a different date field name
   python export_access_table_alternative.py --date-field invoice_date --start-date 2024-01-01
+  
+  # Export to CSV (much faster than XLSX for large ranges)
+  python export_access_table_alternative.py --start-date 2024-01-01 --format csv
         """
     )
     parser.add_argument(
@@ -262,48 +737,57 @@ Examples:
         default=DATE_FIELD,
         help=f'Name of the date field in the table (default: {DATE_FIELD})'
     )
+    parser.add_argument(
+        '--format',
+        choices=list(OUTPUT_SINKS),
+        default='xlsx',
+        help='Output file format (default: xlsx). parquet requires pyarrow'
+    )
+    parser.add_argument(
+        '--max-rows-per-sheet',
+        type=int,
+        default=MAX_ROWS_PER_SHEET,
+        help=f'XLSX only: data rows per worksheet before continuing on a new sheet '
+             f'(default: {MAX_ROWS_PER_SHEET:,}; Excel allows at most {XLSX_MAX_ROWS - 1:,})'
+    )
     parser.add_argument(
         '--delete',
         action='store_true',
         help='Prompt to delete records after export (default: export only)'
     )
+    parser.add_argument(
+        '--keep-access-open',
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help='When Access is used (no DAO engine installed), leave it running after the '
+             'export so the next run reuses it (default: on for interactive runs, off otherwise)'
+    )
     
     args = parser.parse_args()
     
-    # Convert dates to Access format (MM/DD/YYYY)
+    if not 0 < args.max_rows_per_sheet < XLSX_MAX_ROWS:
+        parser.error(f"--max-rows-per-sheet must be between 1 and {XLSX_MAX_ROWS - 1}")
+    
+    keep_access_open = args.keep_access_open
+    if keep_access_open is None:
+        keep_access_open = sys.stdin.isatty()
+    
+    # Parse dates into datetimes (bound as query parameters, not formatted into SQL)
     start_date = None
     end_date = None
     
     if args.start_date:
         try:
-            # Try to parse different date formats
-            for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y']:
-                try:
-                    dt = datetime.datetime.strptime(args.start_date, fmt)
-                    start_date = dt.strftime('%m/%d/%Y')
-                    break
-                except ValueError:
-                    continue
-            if not start_date:
-                raise ValueError(f"Could not parse start date: {args.start_date}")
-        except Exception as e:
+            start_date = parse_date(args.start_date)
+        except ValueError as e:
             print(f"ERROR: Invalid start date format: {e}")
             print("Use format: YYYY-MM-DD or MM/DD/YYYY")
             sys.exit(1)
     
     if args.end_date:
         try:
-            # Try to parse different date formats
-            for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y']:
-                try:
-                    dt = datetime.datetime.strptime(args.end_date, fmt)
-                    end_date = dt.strftime('%m/%d/%Y')
-                    break
-                except ValueError:
-                    continue
-            if not end_date:
-                raise ValueError(f"Could not parse end date: {args.end_date}")
-        except Exception as e:
+            end_date = parse_date(args.end_date)
+        except ValueError as e:
             print(f"ERROR: Invalid end date format: {e}")
             print("Use format: YYYY-MM-DD or MM/DD/YYYY")
             sys.exit(1)
@@ -318,74 +802,94 @@ Examples:
     if start_date or end_date:
         date_suffix = ""
         if start_date:
-            date_suffix += f"_from_{start_date.replace('/', '-')}"
+            date_suffix += f"_from_{start_date.strftime('%m-%d-%Y')}"
         if end_date:
-            date_suffix += f"_to_{end_date.replace('/', '-')}"
-        output_file = f"tblClientBilling_export{date_suffix}_{timestamp}.xlsx"
+            date_suffix += f"_to_{end_date.strftime('%m-%d-%Y')}"
+        output_file = f"tblClientBilling_export{date_suffix}_{timestamp}.{args.format}"
     else:
-        output_file = f"tblClientBilling_export_{timestamp}.xlsx"
+        output_file = f"tblClientBilling_export_{timestamp}.{args.format}"
     
-    # Export table to Excel
+    # Open the database once for the export and the optional delete. An
+    # export-only run opens it shared and read-only. A --delete run needs it
+    # writable and exclusive: the DELETE runs in one transaction, and in shared
+    # mode Jet would lock every deleted record until the commit, failing large
+    # deletes with MaxLocksPerFile (error 3052)
+    session = AccessSession(ACCESS_DB, exclusive=args.delete, read_only=not args.delete,
+                            keep_access_open=keep_access_open)
     try:
-        print(f"Exporting table '{TABLE_NAME}' to Excel...")
-        print("(This may take a moment if the table is large)")
-        row_count = export_table_to_excel_via_com(
-            ACCESS_DB, 
-            TABLE_NAME, 
-            output_file,
-            date_field=args.date_field if (start_date or end_date) else None,
-            start_date=start_date,
-            end_date=end_date
-        )
-        print(f"SUCCESS: Exported {row_count} rows to '{output_file}'")
+        session.open()
     except Exception as e:
-        print(f"ERROR: Failed to export table: {e}")
+        print(f"ERROR: Failed to open database: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
-
-    # Only prompt to delete if --delete flag is set
-    if not args.delete:
-        print("\nExport complete. Records were NOT deleted.")
-        print("(Use --delete flag to enable record deletion)")
-        print("Script completed successfully.")
-        return
-
-    # Prompt to empty table
-    print(f"\n{'='*60}")
-    if start_date or end_date:
-        print(f"WARNING: You are about to DELETE FILTERED ROWS from '{TABLE_NAME}'")
-        if start_date and end_date:
-            print(f"Date range: {start_date} to {end_date}")
-        elif start_date:
-            print(f"From: {start_date} onwards")
-        elif end_date:
-            print(f"Up to: {end_date}")
-    else:
-        print(f"WARNING: You are about to DELETE ALL ROWS from '{TABLE_NAME}'")
-    print(f"{'='*60}")
-    response = input("Do you want to delete these records? (yes/no): ").strip().lower()
     
-    if response in ("y", "yes"):
+    with session:
+        # Export table to Excel
         try:
-            print(f"\nDeleting records from '{TABLE_NAME}'...")
-            empty_table_via_com(
-                ACCESS_DB, 
-                TABLE_NAME,
+            print(f"Exporting table '{TABLE_NAME}' to {args.format.upper()}...")
+            print("(This may take a moment if the table is large)")
+            row_count = export_table_to_excel_via_com(
+                session.db, 
+                TABLE_NAME, 
+                output_file,
                 date_field=args.date_field if (start_date or end_date) else None,
                 start_date=start_date,
-                end_date=end_date
+                end_date=end_date,
+                queries=session.queries,
+                max_rows_per_sheet=args.max_rows_per_sheet
             )
-            print(f"SUCCESS: Records have been deleted from '{TABLE_NAME}'.")
+            print(f"SUCCESS: Exported {row_count} rows to '{output_file}'")
         except Exception as e:
-            print(f"ERROR: Failed to delete records: {e}")
+            print(f"ERROR: Failed to export table: {e}")
             import traceback
             traceback.print_exc()
             sys.exit(1)
-    else:
-        print("\nTable was NOT modified. Only export was performed.")
 
-    print("\nScript completed successfully.")
+        # Only prompt to delete if --delete flag is set
+        if not args.delete:
+            print("\nExport complete. Records were NOT deleted.")
+            print("(Use --delete flag to enable record deletion)")
+            print("Script completed successfully.")
+            return
+
+        # Prompt to empty table
+        print(f"\n{'='*60}")
+        if start_date or end_date:
+            print(f"WARNING: You are about to DELETE FILTERED ROWS from '{TABLE_NAME}'")
+            if start_date and end_date:
+                print(f"Date range: {format_date(start_date)} to {format_date(end_date)}")
+            elif start_date:
+                print(f"From: {format_date(start_date)} onwards")
+            elif end_date:
+                print(f"Up to: {format_date(end_date)}")
+        else:
+            print(f"WARNING: You are about to DELETE ALL ROWS from '{TABLE_NAME}'")
+        print(f"{'='*60}")
+        response = input("Do you want to delete these records? (yes/no): ").strip().lower()
+        
+        if response in ("y", "yes"):
+            try:
+                print(f"\nDeleting records from '{TABLE_NAME}'...")
+                empty_table_via_com(
+                    session.db, 
+                    TABLE_NAME,
+                    date_field=args.date_field if (start_date or end_date) else None,
+                    start_date=start_date,
+                    end_date=end_date,
+                    workspace=session.workspace,
+                    queries=session.queries
+                )
+                print(f"SUCCESS: Records have been deleted from '{TABLE_NAME}'.")
+            except Exception as e:
+                print(f"ERROR: Failed to delete records: {e}")
+                import traceback
+                traceback.print_exc()
+                sys.exit(1)
+        else:
+            print("\nTable was NOT modified. Only export was performed.")
+
+        print("\nScript completed successfully.")
 
 
 if __name__ == "__main__":
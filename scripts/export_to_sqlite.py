@@ -1,25 +1,34 @@
 """
 Export Access database tables to Excel and SQLite database.
 
-This script uses pywin32 (COM) to connect to Access database and exports
-multiple related tables to both Excel files and a SQLite database.
+This script reads the Access database through pyodbc when the Access ODBC
+driver is installed, and otherwise through ADO (the ACE OLEDB provider, via
+pywin32 COM) - neither starts Access - and exports multiple related tables
+to both Excel files and a SQLite database.
 Supports filtering by date range for the main billing table.
 """
 
 
 import os
+import re
 import sys
 import datetime
 import pandas as pd
 import sqlite3
 import argparse
 import yaml
-import pywintypes
-import datetime as dt
-import pywintypes
-import subprocess
+import xlsxwriter
+import decimal
 import traceback
 
+from background_writer import BackgroundWriter, close_writers
+
+# libyaml's C loader parses config.yaml about 10x faster than the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 try:
     import win32com.client
     import pythoncom
@@ -28,11 +37,64 @@ except ImportError:
     print("Install it with: pip install pywin32")
     sys.exit(1)
 
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None
+
 # Configuration
 ACCESS_DB = r"C:\testData\AGE-Projects_be.accdb"
 MAIN_TABLE = "tblClientBilling"
 RELATED_TABLES = ["tblProject", "tblClient", "tblPayItem"]
 DATE_FIELD = "date"  # Name of the date field in the main table
+GETROWS_CHUNK_SIZE = 10000  # Rows fetched per Recordset.GetRows call
+# --start-date/--end-date shapes: YYYY-MM-DD, or MM-DD-YYYY / MM/DD/YYYY
+# (read as DD-MM-YYYY / DD/MM/YYYY when the first number cannot be a month)
+DATE_ARGUMENT_PATTERN = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})|(\d{1,2})([-/])(\d{1,2})\5(\d{4})")
+WRITE_QUEUE_SIZE = 4  # Blocks buffered between the Access reader and each writer thread
+
+# Read through ODBC when pyodbc and the Access ODBC driver are installed, else ADO
+ACCESS_ODBC_DRIVER = "Microsoft Access Driver (*.mdb, *.accdb)"
+
+# ADO constants
+ACE_OLEDB_PROVIDER = "Microsoft.ACE.OLEDB.12.0"
+AD_USE_SERVER = 2  # adUseServer: rows stay with the provider until fetched
+AD_OPEN_FORWARD_ONLY = 0  # adOpenForwardOnly
+AD_LOCK_READ_ONLY = 1  # adLockReadOnly
+AD_CMD_TEXT = 1  # adCmdText
+AD_MODE_SHARE_EXCLUSIVE = 12  # adModeShareExclusive
+AD_DATE_TYPES = (7, 133, 135)  # adDate, adDBDate, adDBTimeStamp (Access Date/Time is adDate)
+AD_INTEGER_TYPES = (2, 3, 11, 16, 17, 18, 19, 20, 21)  # adSmallInt, adInteger, adBoolean, adTinyInt, adUnsigned*, adBigInt
+AD_DECIMAL_TYPES = (6, 14, 131)  # adCurrency, adDecimal, adNumeric (returned as decimal.Decimal)
+AD_REAL_TYPES = (4, 5) + AD_DECIMAL_TYPES  # adSingle, adDouble
+
+# SQLite column types for the Python types pyodbc reports in cursor.description
+ODBC_SQLITE_TYPES = {
+    datetime.datetime: "TIMESTAMP",
+    int: "INTEGER",
+    bool: "INTEGER",
+    float: "REAL",
+    decimal.Decimal: "REAL",
+}
+
+# The SQLite file is rebuilt from Access on every run, so it does not need
+# crash durability while it is being written: skip fsyncs and keep the
+# rollback journal and temp tables in memory, with a ~200 MB page cache
+SQLITE_BULK_LOAD_PRAGMAS = """
+PRAGMA synchronous=OFF;
+PRAGMA journal_mode=MEMORY;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-200000;
+"""
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # How dates are stored (what pandas' to_sql wrote)
+
+# Join keys of the lookup tables (see BQE_Export_Query.sql), indexed once
+# each table is fully loaded rather than maintained row by row during the insert
+SQLITE_INDEXES = {
+    "tblProject": ["projectid"],
+    "tblClient": ["clientid"],
+    "tblPayItem": ["payitemid"],
+}
 
 
 def load_config():
@@ -44,7 +106,7 @@ def load_config():
     if os.path.exists(config_path):
         try:
             with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=SafeLoader)
                 return config if config else {}
         except Exception as e:
             print(f"Warning: Could not load config.yaml: {e}")
@@ -52,106 +114,454 @@ def load_config():
     return {}
 
 
-def cleanup_access_processes():
-    """Kill any lingering Access processes on Windows."""
+def parse_date_argument(value):
+    """
+    Convert a start/end date from the command line or config.yaml to Access's MM/DD/YYYY.
+    
+    The layout is picked from the shape of the value (one regex match)
+    instead of trying each strptime format in turn until one stops raising.
+    
+    Args:
+        value: Date string in one of the DATE_ARGUMENT_PATTERN shapes, or a
+            date (YAML reads an unquoted 2024-01-31 as one)
+        
+    Returns:
+        str date in MM/DD/YYYY format, or None if the value is not a valid date
+    """
+    if isinstance(value, datetime.date):
+        return value.strftime('%m/%d/%Y')
+    
+    match = DATE_ARGUMENT_PATTERN.fullmatch(str(value).strip())
+    if not match:
+        return None
+    if match.group(1):
+        year, month, day = match.group(1, 2, 3)
+    else:
+        month, day, year = match.group(4, 6, 7)
+        if int(month) > 12:
+            month, day = day, month
     try:
+        return datetime.date(int(year), int(month), int(day)).strftime('%m/%d/%Y')
+    except ValueError:
+        return None
+
+
+def open_access_connection(db_path):
+    """
+    Open a read connection to an Access database.
+    
+    pyodbc with the Access ODBC driver is used when both are installed: rows
+    are fetched by the driver in C and arrive as plain Python values, with no
+    COM marshalling. Otherwise the database is read through ADO via the ACE
+    OLEDB provider. Neither needs an Access.Application: no MSACCESS.EXE
+    process is started (or left behind), and queries go straight to the
+    database engine.
+    
+    Args:
+        db_path: Path to the Access database file
         
-        # Use taskkill to forcefully close any remaining MSACCESS.EXE processes
-        subprocess.run(['taskkill', '/F', '/IM', 'MSACCESS.EXE'], 
-                      capture_output=True, timeout=5)
-        print("Cleaned up Access processes")
-    except Exception as e:
-        # Silently fail if unable to kill process (it may not exist)
+    Returns:
+        pyodbc.Connection, or ADODB.Connection COM object
+    """
+    if pyodbc is not None and ACCESS_ODBC_DRIVER in pyodbc.drivers():
+        print(f"  Reading through ODBC ({ACCESS_ODBC_DRIVER})")
+        return pyodbc.connect(f"DRIVER={{{ACCESS_ODBC_DRIVER}}};DBQ={db_path};", readonly=True)
+    
+    print(f"  Reading through ADO ({ACE_OLEDB_PROVIDER})")
+    conn = win32com.client.Dispatch("ADODB.Connection")
+    conn.Open(f"Provider={ACE_OLEDB_PROVIDER};Data Source={db_path};")
+    return conn
+
+
+def close_access_connection(conn):
+    """Close a connection from open_access_connection, ignoring errors."""
+    try:
+        if pyodbc is not None and isinstance(conn, pyodbc.Connection):
+            conn.close()
+        else:
+            conn.Close()
+    except:
         pass
 
 
-def export_table_to_dataframe(access, table_name, date_field=None, start_date=None, end_date=None):
+def open_recordset(conn, sql):
     """
-    Export a table to a pandas DataFrame.
+    Run a query as a server-side, forward-only, read-only ADO recordset.
+    
+    This is the cheapest cursor ADO offers for a single front-to-back read:
+    no client-side copy of the results, no bookmarks and no locking.
+    
+    Args:
+        conn: Open ADODB.Connection
+        sql: SELECT statement
+        
+    Returns:
+        ADODB.Recordset positioned on the first row
+    """
+    rs = win32com.client.Dispatch("ADODB.Recordset")
+    rs.CursorLocation = AD_USE_SERVER
+    rs.Open(sql, conn, AD_OPEN_FORWARD_ONLY, AD_LOCK_READ_ONLY, AD_CMD_TEXT)
+    return rs
+
+
+def read_ado_blocks(conn, sql):
+    """
+    Run a query through ADO and read its rows in GetRows blocks.
+    
+    The recordset is closed when the generator is exhausted or closed.
     
     Args:
-        access: Access.Application COM object
+        conn: Open ADODB.Connection
+        sql: SELECT statement
+        
+    Yields:
+        First (columns, column_types, decimal_indexes) - column names, SQLite
+        column types and the indexes of columns holding decimal.Decimal
+        values - then each block of rows as one list of values per column
+    """
+    rs = open_recordset(conn, sql)
+    try:
+        fields = [rs.Fields.Item(i) for i in range(rs.Fields.Count)]
+        yield ([field.Name for field in fields],
+               [sqlite_column_type(field.Type) for field in fields],
+               [i for i, field in enumerate(fields) if field.Type in AD_DECIMAL_TYPES])
+        
+        # A forward-only recordset is already on its first row and cannot MoveFirst
+        # GetRows is only called while rows remain, so any error it raises is a
+        # real read failure and propagates instead of truncating the table
+        while not rs.EOF:
+            block = rs.GetRows(GETROWS_CHUNK_SIZE)
+            if not block or not block[0]:
+                break
+            yield list(block)
+    finally:
+        rs.Close()
+
+
+def read_odbc_blocks(conn, sql):
+    """
+    Run a query through pyodbc and read its rows in fetchmany blocks.
+    
+    The cursor is closed when the generator is exhausted or closed.
+    
+    Args:
+        conn: Open pyodbc.Connection
+        sql: SELECT statement
+        
+    Yields:
+        The same header tuple and column-major blocks as read_ado_blocks
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql)
+        python_types = [column[1] for column in cursor.description]
+        yield ([column[0] for column in cursor.description],
+               [ODBC_SQLITE_TYPES.get(python_type, "TEXT") for python_type in python_types],
+               [i for i, python_type in enumerate(python_types) if python_type is decimal.Decimal])
+        
+        while True:
+            rows = cursor.fetchmany(GETROWS_CHUNK_SIZE)
+            if not rows:
+                break
+            # Transpose to the column-major layout GetRows returns
+            yield list(zip(*rows))
+    finally:
+        cursor.close()
+
+
+def build_date_filter(date_field=None, start_date=None, end_date=None):
+    """
+    Build the WHERE condition for an optional date range.
+    
+    Args:
+        date_field: Name of the date field (optional)
+        start_date: Start date in MM/DD/YYYY format, inclusive (optional)
+        end_date: End date in MM/DD/YYYY format, inclusive (optional)
+        
+    Returns:
+        str condition, or None when there is nothing to filter on
+    """
+    conditions = []
+    if date_field and start_date:
+        conditions.append(f"[{date_field}] >= #{start_date}#")
+    if date_field and end_date:
+        conditions.append(f"[{date_field}] <= #{end_date}#")
+    return ' AND '.join(conditions) or None
+
+
+def build_id_filter(id_column, source, source_filter=None):
+    """
+    Build a condition keeping rows whose id appears in the (filtered) source table.
+    
+    The ids are selected by a subquery instead of being listed inline, so the
+    SQL stays short however many ids match and Jet can resolve the filter as
+    a join against the source table's index. DISTINCT reduces the subquery
+    to one row per id (the billing table repeats each project thousands of
+    times) before it is matched against the target table.
+    
+    Args:
+        id_column: Name of the id column (same name in both tables)
+        source: Name of the table the ids come from
+        source_filter: WHERE condition the source table was exported with (optional)
+        
+    Returns:
+        str condition such as "[projectid] IN (SELECT DISTINCT [projectid] FROM [tblClientBilling] WHERE ...)"
+    """
+    subquery = f"SELECT DISTINCT [{id_column}] FROM [{source}]"
+    if source_filter:
+        subquery += f" WHERE {source_filter}"
+    return f"[{id_column}] IN ({subquery})"
+
+
+def sqlite_column_type(field_type):
+    """
+    Map an ADO field type to the SQLite column type pandas' to_sql used for it.
+    
+    Args:
+        field_type: ADO DataTypeEnum value (Field.Type)
+        
+    Returns:
+        str SQLite column type
+    """
+    if field_type in AD_DATE_TYPES:
+        return "TIMESTAMP"
+    if field_type in AD_INTEGER_TYPES:
+        return "INTEGER"
+    if field_type in AD_REAL_TYPES:
+        return "REAL"
+    return "TEXT"
+
+
+def to_naive_datetime(value):
+    """
+    Convert a pywintypes datetime (which carries a UTC timezone) to a naive
+    datetime to the second, keeping the wall-clock time stored in Access.
+    """
+    if value is None:
+        return None
+    return datetime.datetime(value.year, value.month, value.day,
+                             value.hour, value.minute, value.second)
+
+
+def create_sqlite_table(sqlite_conn, table_name, columns, column_types):
+    """
+    (Re)create an empty SQLite table with the given columns.
+    
+    Args:
+        sqlite_conn: Open sqlite3 connection
+        table_name: Name of the table to create
+        columns: Column names
+        column_types: SQLite column type for each column
+    """
+    column_defs = ",\n  ".join(f'"{column}" {column_type}' for column, column_type in zip(columns, column_types))
+    sqlite_conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+    sqlite_conn.execute(f'CREATE TABLE "{table_name}" (\n{column_defs}\n)')
+
+
+def create_sqlite_indexes(sqlite_conn, table_name):
+    """
+    Index a loaded table's join keys (see SQLITE_INDEXES).
+    
+    Args:
+        sqlite_conn: Open sqlite3 connection
+        table_name: Name of the table that was just loaded
+    """
+    columns = {row[1] for row in sqlite_conn.execute(f'PRAGMA table_info("{table_name}")')}
+    for column in SQLITE_INDEXES.get(table_name, []):
+        if column in columns:
+            sqlite_conn.execute(f'CREATE INDEX "ix_{table_name}_{column}" ON "{table_name}" ("{column}")')
+
+
+class SqliteTableSink:
+    """
+    Insert blocks of rows into a newly (re)created SQLite table.
+    
+    The table is recreated, loaded and indexed in one transaction, committed
+    by close(); abort() rolls it back so a failed export never leaves a
+    truncated table in the database.
+    """
+    
+    def __init__(self, sqlite_conn, table_name, columns, column_types, decimal_indexes):
+        self.sqlite_conn = sqlite_conn
+        self.table_name = table_name
+        self.decimal_indexes = decimal_indexes
+        self.date_indexes = [i for i, column_type in enumerate(column_types) if column_type == "TIMESTAMP"]
+        # sqlite3 would run the DROP/CREATE TABLE outside any transaction
+        sqlite_conn.execute("BEGIN")
+        create_sqlite_table(sqlite_conn, table_name, columns, column_types)
+        self.insert_sql = f'INSERT INTO "{table_name}" VALUES ({", ".join("?" * len(columns))})'
+    
+    def write(self, block):
+        # Only the converted columns are copied (the block is shared with the
+        # Excel writer), and zip(*block) hands executemany row tuples without
+        # building a list of rows
+        block = list(block)
+        for i in self.decimal_indexes:
+            block[i] = [None if value is None else float(value) for value in block[i]]
+        for i in self.date_indexes:
+            block[i] = [None if value is None else value.strftime(SQLITE_DATETIME_FORMAT)
+                        for value in block[i]]
+        self.sqlite_conn.executemany(self.insert_sql, zip(*block))
+    
+    def close(self):
+        create_sqlite_indexes(self.sqlite_conn, self.table_name)
+        self.sqlite_conn.commit()
+    
+    def abort(self):
+        self.sqlite_conn.rollback()
+
+
+class ExcelTableSink:
+    """
+    Write blocks of rows to an Excel file with xlsxwriter.
+    
+    The workbook is in constant_memory mode, so each row is flushed to disk
+    once the next one is started. Strings are written as plain text (never
+    turned into formulas or hyperlinks), and dates get a workbook-level format.
+    """
+    
+    def __init__(self, excel_file, columns, column_types):
+        self.date_indexes = [i for i, column_type in enumerate(column_types) if column_type == "TIMESTAMP"]
+        self.workbook = xlsxwriter.Workbook(excel_file, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
+        self.worksheet = self.workbook.add_worksheet()
+        header_format = self.workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        self.worksheet.write_row(0, 0, [str(column) for column in columns], header_format)
+        self.row_idx = 1
+    
+    def write(self, block):
+        block = list(block)
+        for i in self.date_indexes:
+            block[i] = [to_naive_datetime(value) for value in block[i]]
+        for row in zip(*block):
+            self.worksheet.write_row(self.row_idx, 0, row)
+            self.row_idx += 1
+    
+    def close(self):
+        self.workbook.close()
+
+
+def export_table_streaming(conn, table_name, sqlite_conn, excel_file=None,
+                           date_field=None, start_date=None, end_date=None,
+                           where_clause=None, filter_description=None):
+    """
+    Copy a table from Access into SQLite (and optionally an Excel file) in one pass.
+    
+    Rows are read in blocks of GETROWS_CHUNK_SIZE (Recordset.GetRows over
+    ADO, fetchmany over ODBC). Each block is handed to a SQLite writer thread
+    and an Excel writer thread while the next one is fetched, so at most a
+    few blocks of the table are held in memory instead of the whole table.
+    
+    Args:
+        conn: Open connection to the Access database (see open_access_connection)
         table_name: Name of the table to export
+        sqlite_conn: Open sqlite3 connection (check_same_thread=False); the table is replaced
+        excel_file: Path of the .xlsx file to write (optional)
         date_field: Name of the date field for filtering (optional)
         start_date: Start date for filtering (optional)
         end_date: End date for filtering (optional)
+        where_clause: SQL condition to filter on instead of the date range,
+            e.g. "[projectid] IN (1, 2)" (optional)
+        filter_description: Text logged for where_clause (defaults to the clause)
         
     Returns:
-        pandas DataFrame with the table data
-    """    
-    
+        int number of rows exported
+    """
     print(f"\n  Exporting table '{table_name}'...")
     
-    # Build SQL query with optional date filter
-    if date_field and start_date and end_date:
-        sql = f"SELECT * FROM [{table_name}] WHERE [{date_field}] >= #{start_date}# AND [{date_field}] <= #{end_date}#"
+    # Build SQL query with optional filter
+    if where_clause:
+        print(f"    Filtering: {filter_description or where_clause}")
+    elif date_field and start_date and end_date:
         print(f"    Filtering: {date_field} between {start_date} and {end_date}")
     elif date_field and start_date:
-        sql = f"SELECT * FROM [{table_name}] WHERE [{date_field}] >= #{start_date}#"
         print(f"    Filtering: {date_field} >= {start_date}")
     elif date_field and end_date:
-        sql = f"SELECT * FROM [{table_name}] WHERE [{date_field}] <= #{end_date}#"
         print(f"    Filtering: {date_field} <= {end_date}")
     else:
-        sql = f"SELECT * FROM [{table_name}]"
         print(f"    Exporting all records")
     
-    # Execute query
-    db = access.CurrentDb()
-    rs = db.OpenRecordset(sql)
+    if not where_clause:
+        where_clause = build_date_filter(date_field, start_date, end_date)
+    sql = f"SELECT * FROM [{table_name}]"
+    if where_clause:
+        sql += f" WHERE {where_clause}"
     
-    # Get field names
-    field_count = rs.Fields.Count
-    columns = [rs.Fields.Item(i).Name for i in range(field_count)]
-    print(f"    Found {field_count} fields")
-    
-    # Check if recordset is empty
-    if rs.EOF and rs.BOF:
-        print(f"    No records found")
-        rs.Close()
-        return pd.DataFrame(columns=columns)
+    # Execute query
+    if pyodbc is not None and isinstance(conn, pyodbc.Connection):
+        blocks = read_odbc_blocks(conn, sql)
+    else:
+        blocks = read_ado_blocks(conn, sql)
+    columns, column_types, decimal_indexes = next(blocks)
+    print(f"    Found {len(columns)} fields")
     
-    # Read all data row-by-row
-    data = []
+    writers = []
     row_count = 0
-    rs.MoveFirst()
-    
-    while not rs.EOF:
-        row = []
-        for col_idx in range(field_count):
-            try:
-                value = rs.Fields.Item(col_idx).Value
-                row.append(value)
-            except:
-                row.append(None)
-        data.append(row)
-        row_count += 1
-        
-        if row_count % 1000 == 0:
-            print(f"    Read {row_count} rows...", end='\r')
+    try:
+        print(f"    Writing to SQLite table '{table_name}'...")
+        writers.append(BackgroundWriter(SqliteTableSink(sqlite_conn, table_name, columns, column_types, decimal_indexes),
+                                        WRITE_QUEUE_SIZE))
+        if excel_file:
+            print(f"    Writing to Excel: {excel_file}")
+            writers.append(BackgroundWriter(ExcelTableSink(excel_file, columns, column_types), WRITE_QUEUE_SIZE))
         
-        rs.MoveNext()
+        for block in blocks:
+            for writer in writers:
+                writer.write(block)
+            row_count += len(block[0])
+    except BaseException:
+        # A failed read or write rolls the SQLite table back instead of
+        # committing (and indexing) the rows loaded so far
+        blocks.close()
+        try:
+            close_writers(writers, abort=True)
+        except Exception:
+            pass
+        raise
     
-    if row_count >= 1000:
-        print(f"    Read {row_count} rows... Done!")
-    else:
+    blocks.close()
+    close_writers(writers)
+    
+    if row_count:
         print(f"    Read {row_count} rows")
+    else:
+        print(f"    No records found")
+    return row_count
+
+
+def export_filtered_table(conn, table_name, sqlite_conn, id_column, source, source_filter=None,
+                          excel_file=None):
+    """
+    Export the rows of a table whose id column matches an id in the source table.
     
-    rs.Close()
+    Args:
+        conn: Open connection to the Access database (see open_access_connection)
+        table_name: Name of the table to export
+        sqlite_conn: Open sqlite3 connection holding the exported source table
+        id_column: Name of the id column to filter on
+        source: Name of the table the ids come from
+        source_filter: WHERE condition the source table was exported with (optional)
+        excel_file: Path of the .xlsx file to write (optional)
+        
+    Returns:
+        int number of rows exported
+    """
+    # The source rows are already in SQLite; count their ids there for the log
+    id_count = sqlite_conn.execute(f'SELECT COUNT(DISTINCT "{id_column}") FROM "{source}"').fetchone()[0]
     
-    # Convert pywintypes datetime objects to regular Python datetime
-    for row in data:
-        for i in range(len(row)):
-            if isinstance(row[i], pywintypes.TimeType):
-                try:
-                    row[i] = dt.datetime(row[i].year, row[i].month, row[i].day,
-                                        row[i].hour, row[i].minute, row[i].second)
-                except:
-                    row[i] = None
+    # With no ids the subquery is skipped: a condition that is never true still
+    # returns the table's columns (so the empty table is created) but no rows
+    where_clause = build_id_filter(id_column, source, source_filter) if id_count else "1 = 0"
     
-    # Create DataFrame
-    df = pd.DataFrame(data, columns=columns)
-    return df
+    return export_table_streaming(
+        conn, table_name, sqlite_conn, excel_file,
+        where_clause=where_clause,
+        filter_description=f"{id_column} in {source} ({id_count} unique values)"
+    )
 
 
 def export_to_sqlite_and_excel(db_path, output_sqlite, output_excel_dir, 
@@ -163,7 +573,7 @@ def export_to_sqlite_and_excel(db_path, output_sqlite, output_excel_dir,
     Args:
         db_path: Path to the Access database file
         output_sqlite: Path to the output SQLite database file
-        output_excel_dir: Directory for Excel output files
+        output_excel_dir: Directory for Excel output files (None to skip the Excel files)
         date_field: Name of the date field for filtering main table (optional)
         start_date: Start date for filtering (optional)
         end_date: End date for filtering (optional)
@@ -178,17 +588,9 @@ def export_to_sqlite_and_excel(db_path, output_sqlite, output_excel_dir,
     
     # Connect to Access
     print("Opening Access database...")
-    try:
-        access = win32com.client.GetActiveObject("Access.Application")
-        try:
-            access.CloseCurrentDatabase()
-        except:
-            pass
-    except:
-        access = win32com.client.Dispatch("Access.Application")
+    conn = open_access_connection(db_path)
     
     try:
-        access.OpenCurrentDatabase(db_path, False)
         print("Database opened successfully")
         
         # Create SQLite connection
@@ -198,261 +600,55 @@ def export_to_sqlite_and_excel(db_path, output_sqlite, output_excel_dir,
             os.rename(output_sqlite, backup)
             print(f"  Existing database backed up to: {backup}")
         
-        sqlite_conn = sqlite3.connect(output_sqlite)
+        # Tables are written from a worker thread (see BackgroundWriter)
+        sqlite_conn = sqlite3.connect(output_sqlite, check_same_thread=False)
+        sqlite_conn.executescript(SQLITE_BULK_LOAD_PRAGMAS)
         
         # Create output directory for Excel files if it doesn't exist
-        os.makedirs(output_excel_dir, exist_ok=True)
-        
-        # Export main table (with date filtering)
-        df_main = export_table_to_dataframe(access, MAIN_TABLE, date_field, start_date, end_date)
-        stats[MAIN_TABLE] = len(df_main)
-        
-        # Save to SQLite
-        print(f"    Writing to SQLite table '{MAIN_TABLE}'...")
-        df_main.to_sql(MAIN_TABLE, sqlite_conn, if_exists='replace', index=False)
-        
-        # Save to Excel
-        excel_file = os.path.join(output_excel_dir, f"{MAIN_TABLE}.xlsx")
-        print(f"    Writing to Excel: {excel_file}")
-        df_main.to_excel(excel_file, index=False, engine='openpyxl')
-        
-        # Export related tables (no date filtering, but optional project filtering)
-        # Track unique clientids from filtered tblProject for tblClient filtering
-        # Track unique payitemids from filtered tblClientBilling for tblPayItem filtering
-        unique_clientids = None
-        unique_payitemids = None
-        
-        # Extract payitemids from main table for tblPayItem filtering
-        if filter_project and 'payitemid' in df_main.columns:
-            unique_payitemids = df_main['payitemid'].dropna().unique().tolist()
-            print(f"\n  Found {len(unique_payitemids)} unique payitemids in {MAIN_TABLE}")
-        
-        for table_name in RELATED_TABLES:
-            # Special handling for tblProject if filter flag is set
-            if table_name == "tblProject" and filter_project:
-                print(f"\n  Exporting table '{table_name}' (filtered by projectid in {MAIN_TABLE})...")
-                
-                # Get unique projectids from main table (after filtering)
-                unique_projectids = df_main['projectid'].dropna().unique().tolist()
-                print(f"    Found {len(unique_projectids)} unique projectids in {MAIN_TABLE}")
-                
-                if len(unique_projectids) == 0:
-                    print(f"    No projectids found - creating empty table")
-                    df = pd.DataFrame()
-                    stats[table_name] = 0
-                    unique_clientids = []
-                else:
-                    # Build SQL query with IN clause for filtering
-                    # Convert projectids to strings for SQL query
-                    projectid_list = ', '.join([str(pid) for pid in unique_projectids])
-                    sql = f"SELECT * FROM [{table_name}] WHERE [projectid] IN ({projectid_list})"
-                    
-              
-                    
-                    db = access.CurrentDb()
-                    rs = db.OpenRecordset(sql)
-                    
-                    # Get field names
-                    field_count = rs.Fields.Count
-                    columns = [rs.Fields.Item(i).Name for i in range(field_count)]
-                    
-                    # Check if recordset is empty
-                    if rs.EOF and rs.BOF:
-                        print(f"    No matching records found")
-                        rs.Close()
-                        df = pd.DataFrame(columns=columns)
-                        stats[table_name] = 0
-                        unique_clientids = []
-                    else:
-                        # Read all data row-by-row
-                        data = []
-                        row_count = 0
-                        rs.MoveFirst()
-                        
-                        while not rs.EOF:
-                            row = []
-                            for col_idx in range(field_count):
-                                try:
-                                    value = rs.Fields.Item(col_idx).Value
-                                    # Convert pywintypes datetime objects
-                                    if isinstance(value, pywintypes.TimeType):
-                                        try:
-                                            value = dt.datetime(value.year, value.month, value.day,
-                                                              value.hour, value.minute, value.second)
-                                        except:
-                                            value = None
-                                    row.append(value)
-                                except:
-                                    row.append(None)
-                            data.append(row)
-                            row_count += 1
-                            rs.MoveNext()
-                        
-                        rs.Close()
-                        print(f"    Read {row_count} filtered rows")
-                        
-                        # Create DataFrame
-                        df = pd.DataFrame(data, columns=columns)
-                        stats[table_name] = len(df)
-                        
-                        # Extract unique clientids from filtered tblProject for filtering tblClient
-                        if 'clientid' in df.columns:
-                            unique_clientids = df['clientid'].dropna().unique().tolist()
-                            print(f"    Found {len(unique_clientids)} unique clientids in filtered {table_name}")
-                        else:
-                            unique_clientids = []
-            
-            # Special handling for tblClient if filter flag is set
-            elif table_name == "tblClient" and filter_project and unique_clientids is not None:
-                print(f"\n  Exporting table '{table_name}' (filtered by clientid in filtered {RELATED_TABLES[0]})...")
-                
-                if len(unique_clientids) == 0:
-                    print(f"    No clientids found - creating empty table")
-                    df = pd.DataFrame()
-                    stats[table_name] = 0
-                else:
-                    # Build SQL query with IN clause for filtering by clientid
-                    clientid_list = ', '.join([str(cid) for cid in unique_clientids])
-                    sql = f"SELECT * FROM [{table_name}] WHERE [clientid] IN ({clientid_list})"
-                    
-                    # Execute query
-                    
-                    
-                    db = access.CurrentDb()
-                    rs = db.OpenRecordset(sql)
-                    
-                    # Get field names
-                    field_count = rs.Fields.Count
-                    columns = [rs.Fields.Item(i).Name for i in range(field_count)]
-                    
-                    # Check if recordset is empty
-                    if rs.EOF and rs.BOF:
-                        print(f"    No matching records found")
-                        rs.Close()
-                        df = pd.DataFrame(columns=columns)
-                        stats[table_name] = 0
-                    else:
-                        # Read all data row-by-row
-                        data = []
-                        row_count = 0
-                        rs.MoveFirst()
-                        
-                        while not rs.EOF:
-                            row = []
-                            for col_idx in range(field_count):
-                                try:
-                                    value = rs.Fields.Item(col_idx).Value
-                                    # Convert pywintypes datetime objects
-                                    if isinstance(value, pywintypes.TimeType):
-                                        try:
-                                            value = dt.datetime(value.year, value.month, value.day,
-                                                              value.hour, value.minute, value.second)
-                                        except:
-                                            value = None
-                                    row.append(value)
-                                except:
-                                    row.append(None)
-                            data.append(row)
-                            row_count += 1
-                            rs.MoveNext()
-                        
-                        rs.Close()
-                        print(f"    Read {row_count} filtered rows")
-                        
-                        # Create DataFrame
-                        df = pd.DataFrame(data, columns=columns)
-                        stats[table_name] = len(df)
+        if output_excel_dir:
+            os.makedirs(output_excel_dir, exist_ok=True)
+        
+        def excel_file(table_name):
+            if not output_excel_dir:
+                return None
+            return os.path.join(output_excel_dir, f"{table_name}.xlsx")
+        
+        try:
+            # Export main table (with date filtering)
+            main_filter = build_date_filter(date_field, start_date, end_date)
+            stats[MAIN_TABLE] = export_table_streaming(conn, MAIN_TABLE, sqlite_conn, excel_file(MAIN_TABLE),
+                                                       date_field, start_date, end_date)
             
-            # Special handling for tblPayItem if filter flag is set
-            elif table_name == "tblPayItem" and filter_project and unique_payitemids is not None:
-                print(f"\n  Exporting table '{table_name}' (filtered by payitemid in {MAIN_TABLE})...")
-                
-                if len(unique_payitemids) == 0:
-                    print(f"    No payitemids found - creating empty table")
-                    df = pd.DataFrame()
-                    stats[table_name] = 0
+            # Export related tables (no date filtering, but optional project filtering):
+            # tblProject and tblPayItem keep the ids used by the filtered tblClientBilling,
+            # tblClient keeps the clientids of the filtered tblProject
+            for table_name in RELATED_TABLES:
+                if table_name == "tblProject" and filter_project:
+                    count = export_filtered_table(conn, table_name, sqlite_conn, 'projectid',
+                                                  MAIN_TABLE, main_filter, excel_file(table_name))
+                elif table_name == "tblClient" and filter_project:
+                    project_filter = build_id_filter('projectid', MAIN_TABLE, main_filter)
+                    count = export_filtered_table(conn, table_name, sqlite_conn, 'clientid',
+                                                  RELATED_TABLES[0], project_filter, excel_file(table_name))
+                elif table_name == "tblPayItem" and filter_project:
+                    count = export_filtered_table(conn, table_name, sqlite_conn, 'payitemid',
+                                                  MAIN_TABLE, main_filter, excel_file(table_name))
                 else:
-                    # Build SQL query with IN clause for filtering by payitemid
-                    payitemid_list = ', '.join([str(pid) for pid in unique_payitemids])
-                    sql = f"SELECT * FROM [{table_name}] WHERE [payitemid] IN ({payitemid_list})"
-                    
-                                
-                    db = access.CurrentDb()
-                    rs = db.OpenRecordset(sql)
-                    
-                    # Get field names
-                    field_count = rs.Fields.Count
-                    columns = [rs.Fields.Item(i).Name for i in range(field_count)]
-                    
-                    # Check if recordset is empty
-                    if rs.EOF and rs.BOF:
-                        print(f"    No matching records found")
-                        rs.Close()
-                        df = pd.DataFrame(columns=columns)
-                        stats[table_name] = 0
-                    else:
-                        # Read all data row-by-row
-                        data = []
-                        row_count = 0
-                        rs.MoveFirst()
-                        
-                        while not rs.EOF:
-                            row = []
-                            for col_idx in range(field_count):
-                                try:
-                                    value = rs.Fields.Item(col_idx).Value
-                                    # Convert pywintypes datetime objects
-                                    if isinstance(value, pywintypes.TimeType):
-                                        try:
-                                            value = dt.datetime(value.year, value.month, value.day,
-                                                              value.hour, value.minute, value.second)
-                                        except:
-                                            value = None
-                                    row.append(value)
-                                except:
-                                    row.append(None)
-                            data.append(row)
-                            row_count += 1
-                            rs.MoveNext()
-                        
-                        rs.Close()
-                        print(f"    Read {row_count} filtered rows")
-                        
-                        # Create DataFrame
-                        df = pd.DataFrame(data, columns=columns)
-                        stats[table_name] = len(df)
-            else:
-                # Normal export without filtering
-                df = export_table_to_dataframe(access, table_name)
-                stats[table_name] = len(df)
-            
-            # Save to SQLite
-            print(f"    Writing to SQLite table '{table_name}'...")
-            df.to_sql(table_name, sqlite_conn, if_exists='replace', index=False)
-            
-            # Save to Excel
-            excel_file = os.path.join(output_excel_dir, f"{table_name}.xlsx")
-            print(f"    Writing to Excel: {excel_file}")
-            df.to_excel(excel_file, index=False, engine='openpyxl')
-        
-        # Commit and close SQLite
-        sqlite_conn.commit()
-        sqlite_conn.close()
+                    # Normal export without filtering
+                    count = export_table_streaming(conn, table_name, sqlite_conn, excel_file(table_name))
+                stats[table_name] = count
+        finally:
+            sqlite_conn.close()
         print(f"\nSQLite database created successfully: {output_sqlite}")
+        if output_excel_dir:
+            print(f"Excel files written to: {output_excel_dir}")
         
         return stats
         
     except Exception as e:
         raise e
     finally:
-        try:
-            access.CloseCurrentDatabase()
-        except:
-            pass
-        try:
-            access.Quit()
-        except:
-            pass
+        close_access_connection(conn)
 
 
 def dump_sqlite_database(sqlite_path):
@@ -542,7 +738,10 @@ def dump_sqlite_database(sqlite_path):
 
 def delete_records_from_access(db_path, table_name, date_field=None, start_date=None, end_date=None):
     """
-    Delete records from the specified table using COM.
+    Delete records from the specified table through ADO.
+    
+    The database is opened exclusively and the DELETE runs in one
+    transaction, so it either removes every matching row or none.
     
     Args:
         db_path: Path to the Access database file
@@ -551,42 +750,28 @@ def delete_records_from_access(db_path, table_name, date_field=None, start_date=
         start_date: Start date for filtering (optional)
         end_date: End date for filtering (optional)
     """
-    try:
-        import win32com.client
-    except ImportError:
-        print("ERROR: pywin32 is not installed.")
-        sys.exit(1)
+    # Build DELETE query with optional date filter
+    where_clause = build_date_filter(date_field, start_date, end_date)
+    if where_clause:
+        sql = f"DELETE FROM [{table_name}] WHERE {where_clause}"
+    else:
+        sql = f"DELETE * FROM [{table_name}]"
     
-    # Connect to Access
+    conn = win32com.client.Dispatch("ADODB.Connection")
+    conn.Mode = AD_MODE_SHARE_EXCLUSIVE
+    conn.Open(f"Provider={ACE_OLEDB_PROVIDER};Data Source={db_path};")
     try:
-        access = win32com.client.GetActiveObject("Access.Application")
+        print(f"  Executing: {sql}")
+        conn.BeginTrans()
         try:
-            access.CloseCurrentDatabase()
+            conn.Execute(sql)
+            conn.CommitTrans()
         except:
-            pass
-    except:
-        access = win32com.client.Dispatch("Access.Application")
-    
-    try:
-        access.OpenCurrentDatabase(db_path, True)  # Exclusive mode
-        
-        # Build DELETE query with optional date filter
-        if date_field and start_date and end_date:
-            sql = f"DELETE FROM [{table_name}] WHERE [{date_field}] >= #{start_date}# AND [{date_field}] <= #{end_date}#"
-        elif date_field and start_date:
-            sql = f"DELETE FROM [{table_name}] WHERE [{date_field}] >= #{start_date}#"
-        elif date_field and end_date:
-            sql = f"DELETE FROM [{table_name}] WHERE [{date_field}] <= #{end_date}#"
-        else:
-            sql = f"DELETE * FROM [{table_name}]"
-        
-        print(f"  Executing: {sql}")
-        access.DoCmd.RunSQL(sql)
+            conn.RollbackTrans()
+            raise
         print(f"  Records deleted successfully")
-        
     finally:
-        access.CloseCurrentDatabase()
-        access.Quit()
+        conn.Close()
 
 
 def main():
@@ -612,6 +797,9 @@ Examples:
   
   # Specify custom output directory
   python export_to_sqlite.py --output-dir ./my_output
+  
+  # Only build the SQLite database (no Excel copies of the tables)
+  python export_to_sqlite.py --no-excel
         """
         )
         parser.add_argument(
@@ -657,6 +845,13 @@ Examples:
             action='store_true',
             help='Dump/display the contents of the SQLite database after export'
         )
+        parser.add_argument(
+            '--excel',
+            action=argparse.BooleanOptionalAction,
+            default=None,
+            help='Also write an Excel copy of each exported table (default: export_excel '
+                 'in config.yaml, otherwise on unless --dump is given)'
+        )
         
         args = parser.parse_args()
         
@@ -691,9 +886,15 @@ Examples:
         output_dir = os.path.join(output_base, f'export_{timestamp}')
         os.makedirs(output_dir, exist_ok=True)
         
+        # The Excel copies are only for people reading the tables by hand;
+        # the SQLite database is what the rest of the pipeline uses
+        write_excel = args.excel
+        if write_excel is None:
+            write_excel = config.get('export_excel', not args.dump)
+        
         # Set paths for SQLite and Excel outputs
         sqlite_path = os.path.join(output_dir, 'timekeeping_export.db')
-        excel_dir = os.path.join(output_dir, 'excel')
+        excel_dir = os.path.join(output_dir, 'excel') if write_excel else None
         
         # Convert dates to Access format (MM/DD/YYYY)
         start_date = None
@@ -701,13 +902,7 @@ Examples:
         
         if start_date_input:
             try:
-                for fmt in ['%m-%d-%Y', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%d-%m-%Y']:
-                    try:
-                        dt = datetime.datetime.strptime(start_date_input, fmt)
-                        start_date = dt.strftime('%m/%d/%Y')
-                        break
-                    except ValueError:
-                        continue
+                start_date = parse_date_argument(start_date_input)
                 if not start_date:
                     raise ValueError(f"Could not parse start date: {start_date_input}")
             except Exception as e:
@@ -717,13 +912,7 @@ Examples:
         
         if end_date_input:
             try:
-                for fmt in ['%m-%d-%Y', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%d-%m-%Y']:
-                    try:
-                        dt = datetime.datetime.strptime(end_date_input, fmt)
-                        end_date = dt.strftime('%m/%d/%Y')
-                        break
-                    except ValueError:
-                        continue
+                end_date = parse_date_argument(end_date_input)
                 if not end_date:
                     raise ValueError(f"Could not parse end date: {end_date_input}")
             except Exception as e:
@@ -744,7 +933,7 @@ Examples:
             print(f"Source: {access_db_path}")
             print(f"Output directory: {output_dir}")
             print(f"SQLite output: {sqlite_path}")
-            print(f"Excel output directory: {excel_dir}")
+            print(f"Excel output directory: {excel_dir or 'skipped'}")
             print(f"Tables: {MAIN_TABLE}, {', '.join(RELATED_TABLES)}")
             if args.filter_project:
                 print(f"Filter tblProject: Yes (only projectids in {MAIN_TABLE})")
@@ -828,9 +1017,6 @@ Examples:
             print(f"\n'{MAIN_TABLE}' was NOT modified.")
         
         print("\nScript completed successfully.")
-        
-        # Clean up any lingering Access processes
-        cleanup_access_processes()
     finally:
         pythoncom.CoUninitialize()
 
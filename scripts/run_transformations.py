@@ -7,7 +7,7 @@ SQL file against the target database, and generates a comprehensive log file
 of all execution results.
 
 Usage:
-  python run_transformations.py [--database <db.db>] [--latest] [--config <config.yaml>]
+  python run_transformations.py [--database <db.db>] [--latest] [--config <config.yaml>] [--fast] [--fsync]
 """
 
 import sqlite3
@@ -15,25 +15,52 @@ import sys
 import os
 import argparse
 import yaml
+from collections import deque
 from datetime import datetime
 
+# libyaml's C loader parses config.yaml about 10x faster than the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 # Set stdout encoding to handle Unicode characters on Windows
 if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+# Project root (the parent of scripts/), resolved once at import
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOG_BUFFER_SIZE = 1 << 16  # Log lines reach the disk in 64 KB writes
+LOG_TAIL_LINES = 10  # Last log lines echoed to the console after the run
+
+# Connection settings for the transformation run: WAL with synchronous=NORMAL
+# only syncs at checkpoints instead of on every commit, temp tables and sorts
+# stay in memory, and pages are cached (64 MB) and memory-mapped (256 MB)
+SQLITE_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-65536;
+PRAGMA mmap_size=268435456;
+PRAGMA foreign_keys=ON;
+"""
+
+# Statements that open or close a transaction; every script already runs in
+# its own transaction, so scripts containing them are rejected
+TRANSACTION_KEYWORDS = ('BEGIN', 'COMMIT', 'END', 'ROLLBACK')
+
 
 def load_config(config_path=None):
     """Load configuration from config.yaml in the project root."""
     if config_path is None:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(script_dir)
-        config_path = os.path.join(project_root, 'config.yaml')
+        config_path = os.path.join(PROJECT_ROOT, 'config.yaml')
     
     if os.path.exists(config_path):
         try:
             with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=SafeLoader)
                 return config if config else {}
         except Exception as e:
             print(f"Warning: Could not load config.yaml: {e}")
@@ -43,12 +70,6 @@ def load_config(config_path=None):
         return {}
 
 
-def get_project_root():
-    """Get the project root directory."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    return os.path.dirname(script_dir)
-
-
 def find_latest_export_db():
     """
     Find the most recently created timekeeping_export.db file in the output directory.
@@ -56,35 +77,33 @@ def find_latest_export_db():
     Returns:
         Path to the latest timekeeping_export.db file, or None if not found
     """
-    project_root = get_project_root()
-    output_dir = os.path.join(project_root, 'output')
+    output_dir = os.path.join(PROJECT_ROOT, 'output')
     
     if not os.path.exists(output_dir):
         return None
     
-    # Get all subdirectories in output/
+    # Get all export_* subdirectories in output/. scandir returns the entry type
+    # with the directory listing, so is_dir() needs no extra stat call per entry
     export_folders = []
-    for folder in os.listdir(output_dir):
-        folder_path = os.path.join(output_dir, folder)
-        if os.path.isdir(folder_path) and folder.startswith('export_'):
-            db_path = os.path.join(folder_path, 'timekeeping_export.db')
-            if os.path.exists(db_path):
-                # Get the modification time of the folder
-                mtime = os.path.getmtime(folder_path)
-                export_folders.append((mtime, db_path))
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith('export_') and entry.is_dir():
+                db_path = os.path.join(entry.path, 'timekeeping_export.db')
+                if os.path.exists(db_path):
+                    # Get the modification time of the folder
+                    export_folders.append((entry.stat().st_mtime, db_path))
     
     if not export_folders:
         return None
     
-    # Sort by modification time (newest first) and return the path
+    # Pick the folder with the newest modification time and return its database
     latest_db = max(export_folders, key=lambda x: x[0])[1]
     return latest_db
 
 
 def get_output_directory():
     """Get or create the output directory."""
-    project_root = get_project_root()
-    output_dir = os.path.join(project_root, 'output')
+    output_dir = os.path.join(PROJECT_ROOT, 'output')
     
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -100,22 +119,22 @@ def read_sql_file(file_path):
         file_path: Path to the SQL file (can be relative to project root)
     
     Returns:
-        Contents of the SQL file
+        tuple: (contents, resolved_path) - the SQL text and the absolute path it was read from
     """
     if not os.path.isabs(file_path):
-        project_root = get_project_root()
-        file_path = os.path.join(project_root, file_path)
+        file_path = os.path.join(PROJECT_ROOT, file_path)
     
     with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
+        return f.read(), file_path
 
 
 def parse_sql_commands(sql_content):
     """
-    Parse SQL content into individual commands while respecting quoted strings.
+    Parse SQL content into individual commands using SQLite's own tokenizer.
     
-    This function splits SQL by semicolons but ignores semicolons that appear
-    inside single or double quoted strings.
+    Each semicolon is a candidate command boundary; sqlite3.complete_statement
+    decides whether the text up to it is a complete statement, so semicolons
+    inside quoted strings, comments and CREATE TRIGGER bodies are not split on.
     
     Args:
         sql_content: The SQL content to parse
@@ -124,43 +143,49 @@ def parse_sql_commands(sql_content):
         List of SQL commands
     """
     commands = []
-    current_command = []
-    in_single_quote = False
-    in_double_quote = False
-    i = 0
+    start = 0
+    pos = sql_content.find(';')
     
-    while i < len(sql_content):
-        char = sql_content[i]
-        
-        # Handle single quotes
-        if char == "'" and not in_double_quote:
-            in_single_quote = not in_single_quote
-            current_command.append(char)
-        # Handle double quotes
-        elif char == '"' and not in_single_quote:
-            in_double_quote = not in_double_quote
-            current_command.append(char)
-        # Handle semicolon (command separator)
-        elif char == ';' and not in_single_quote and not in_double_quote:
-            # End of command
-            command_str = ''.join(current_command).strip()
+    while pos != -1:
+        if sqlite3.complete_statement(sql_content[start:pos + 1]):
+            command_str = sql_content[start:pos].strip()
             if command_str:
                 commands.append(command_str)
-            current_command = []
-        else:
-            current_command.append(char)
-        
-        i += 1
+            start = pos + 1
+        pos = sql_content.find(';', pos + 1)
     
     # Add any remaining command
-    command_str = ''.join(current_command).strip()
+    command_str = sql_content[start:].strip()
     if command_str:
         commands.append(command_str)
     
     return commands
 
 
-def execute_transformation_scripts(db_path, script_paths, log_file):
+def first_keyword(command):
+    """
+    Return the first keyword of a SQL command, skipping leading comments.
+    
+    Args:
+        command: A single SQL command as returned by parse_sql_commands
+    
+    Returns:
+        The first word of the command in upper case, or '' if there is none
+    """
+    text = command.lstrip()
+    while text.startswith(('--', '/*')):
+        if text.startswith('--'):
+            end = text.find('\n')
+            text = text[end + 1:].lstrip() if end != -1 else ''
+        else:
+            end = text.find('*/')
+            text = text[end + 2:].lstrip() if end != -1 else ''
+    
+    words = text.split(None, 1)
+    return words[0].rstrip(';').upper() if words else ''
+
+
+def execute_transformation_scripts(db_path, script_paths, log_file, fast=False, fsync=False):
     """
     Execute multiple SQL transformation scripts against a database.
     
@@ -168,133 +193,193 @@ def execute_transformation_scripts(db_path, script_paths, log_file):
         db_path: Path to the SQLite database file
         script_paths: List of paths to SQL script files
         log_file: Path to the log file for writing results
+        fast: Run each script with a single executescript call instead of one
+              execute call per command (no per-command log lines)
+        fsync: fsync the log file once before closing it
+    
+    Returns:
+        tuple: (success, log_tail, failure_counts) where log_tail holds the last
+        LOG_TAIL_LINES log lines and failure_counts has 'failed_commands',
+        'file_not_found' and 'db_errors' keys
     """
     
-    log_entries = []
     successful_scripts = 0
     failed_scripts = 0
     total_commands = 0
+    failure_counts = {"failed_commands": 0, "file_not_found": 0, "db_errors": 0}
     
-    log_entries.append("=" * 80)
-    log_entries.append(f"SQL TRANSFORMATION EXECUTION LOG")
-    log_entries.append(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    log_entries.append("=" * 80)
-    log_entries.append("")
-    log_entries.append(f"Database: {db_path}")
-    log_entries.append(f"Number of transformation scripts: {len(script_paths)}")
-    log_entries.append("")
+    # Lines are written to the log file as they are produced; only the last
+    # few are kept in memory for the console summary
+    try:
+        log_fh = open(log_file, 'w', encoding='utf-8', buffering=LOG_BUFFER_SIZE)
+    except Exception as e:
+        print(f"ERROR: Could not write log file - {e}")
+        return False, [], failure_counts
+    log_tail = deque(maxlen=LOG_TAIL_LINES)
+    
+    def log(line):
+        log_fh.write(line)
+        log_fh.write('\n')
+        log_tail.append(line)
     
     try:
-        # Connect to SQLite database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Enable foreign keys
-        cursor.execute("PRAGMA foreign_keys = ON")
+        log("=" * 80)
+        log(f"SQL TRANSFORMATION EXECUTION LOG")
+        log(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        log("=" * 80)
+        log("")
+        log(f"Database: {db_path}")
+        log(f"Number of transformation scripts: {len(script_paths)}")
+        log(f"Execution mode: {'fast (executescript)' if fast else 'per command'}")
+        log("")
         
-        log_entries.append("Database connection: SUCCESS")
-        log_entries.append("")
-        log_entries.append("-" * 80)
-        log_entries.append("")
-        
-        # Execute each transformation script
-        for idx, script_path in enumerate(script_paths, 1):
-            log_entries.append(f"[{idx}/{len(script_paths)}] EXECUTING: {script_path}")
-            log_entries.append("-" * 80)
+        try:
+            # Connect to SQLite database. Every script runs on this one connection,
+            # so the page cache and parsed schema stay warm from script to script
+            conn = sqlite3.connect(db_path)
+            conn.executescript(SQLITE_PRAGMAS)
+            cursor = conn.cursor()
             
-            try:
-                # Read the SQL file
-                sql_content = read_sql_file(script_path)
-                
-                # Resolve the full path for logging
-                if os.path.isabs(script_path):
-                    full_path = script_path
-                else:
-                    full_path = os.path.join(get_project_root(), script_path)
-                
-                log_entries.append(f"File path: {full_path}")
-                log_entries.append(f"File exists: {os.path.exists(full_path)}")
-                log_entries.append("")
-                
-                if not sql_content.strip():
-                    log_entries.append("WARNING: Script file is empty")
-                    log_entries.append("")
-                    continue
-                
-                # Parse SQL commands while respecting quoted strings
-                commands = parse_sql_commands(sql_content)
-                
-                log_entries.append(f"Number of SQL commands found: {len(commands)}")
-                log_entries.append("")
+            log("Database connection: SUCCESS")
+            log("")
+            log("-" * 80)
+            log("")
+            
+            # Execute each transformation script
+            for idx, script_path in enumerate(script_paths, 1):
+                log(f"[{idx}/{len(script_paths)}] EXECUTING: {script_path}")
+                log("-" * 80)
                 
-                # Execute each command
-                for cmd_idx, command in enumerate(commands, 1):
-                    total_commands += 1
+                try:
+                    # Read the SQL file; a successful read also confirms it exists
+                    sql_content, full_path = read_sql_file(script_path)
                     
-                    try:
-                        log_entries.append(f"  Command {cmd_idx}: {command[:80]}{'...' if len(command) > 80 else ''}")
-                        
-                        cursor.execute(command)
-                        conn.commit()
-                        
-                        rows_affected = cursor.rowcount
-                        log_entries.append(f"  [OK] Status: SUCCESS (Rows affected: {rows_affected})")
+                    log(f"File path: {full_path}")
+                    log("")
+                    
+                    if not sql_content.strip():
+                        log("WARNING: Script file is empty")
+                        log("")
+                        continue
+                    
+                    # Parse SQL commands at the statement boundaries SQLite reports
+                    commands = parse_sql_commands(sql_content)
+                    
+                    log(f"Number of SQL commands found: {len(commands)}")
+                    log("")
+                    
+                    script_failed = False
+                    transaction_commands = [c for c in commands if first_keyword(c) in TRANSACTION_KEYWORDS]
+                    if transaction_commands:
+                        # The script would end or nest the transaction it runs in
+                        failure_counts["failed_commands"] += 1
+                        log(f"  [X] Status: FAILED")
+                        log(f"  Error: Script manages its own transaction ({transaction_commands[0][:80]}); "
+                            f"remove its BEGIN/COMMIT/ROLLBACK statements")
+                        log(f"  No commands of this script were executed")
+                        script_failed = True
+                    elif fast:
+                        # Hand the parsed commands to SQLite's parser in one call, still
+                        # inside a single transaction. Each command's semicolon goes on its
+                        # own line, so a missing final semicolon or a trailing -- comment
+                        # cannot swallow the COMMIT
+                        total_commands += len(commands)
+                        changes_before = conn.total_changes
+                        try:
+                            conn.executescript("BEGIN;\n" + "\n;\n".join(commands) + "\n;\nCOMMIT;")
+                            log(f"  [OK] Status: SUCCESS (Rows affected: {conn.total_changes - changes_before})")
+                        except sqlite3.Error as e:
+                            failure_counts["failed_commands"] += 1
+                            log(f"  [X] Status: FAILED")
+                            log(f"  Error: {str(e)}")
+                            conn.rollback()
+                            log(f"  Rolled back all commands of this script")
+                            script_failed = True
+                    else:
+                        # Execute each command, with the whole script in one transaction
+                        # (one commit per script instead of one per command)
+                        cursor.execute("BEGIN")
+                        for cmd_idx, command in enumerate(commands, 1):
+                            total_commands += 1
+                            
+                            try:
+                                log(f"  Command {cmd_idx}: {command[:80]}{'...' if len(command) > 80 else ''}")
+                                
+                                cursor.execute(command)
+                                
+                                rows_affected = cursor.rowcount
+                                log(f"  [OK] Status: SUCCESS (Rows affected: {rows_affected})")
+                                
+                            except sqlite3.Error as e:
+                                failure_counts["failed_commands"] += 1
+                                log(f"  [X] Status: FAILED")
+                                log(f"  Error: {str(e)}")
+                                # Undo the script's earlier commands as well and stop here,
+                                # so the script is applied either completely or not at all
+                                conn.rollback()
+                                log(f"  Rolled back all commands of this script")
+                                script_failed = True
+                                break
                         
-                    except sqlite3.Error as e:
-                        log_entries.append(f"  [X] Status: FAILED")
-                        log_entries.append(f"  Error: {str(e)}")
-                        conn.rollback()
-                
-                log_entries.append("")
-                successful_scripts += 1
-                log_entries.append(f"Script result: [OK] COMPLETED SUCCESSFULLY")
-                
-            except FileNotFoundError as e:
-                failed_scripts += 1
-                log_entries.append(f"ERROR: File not found - {e}")
-                log_entries.append(f"Script result: [X] FAILED")
+                        if not script_failed:
+                            conn.commit()
+                    
+                    log("")
+                    if script_failed:
+                        failed_scripts += 1
+                        log(f"Script result: [X] FAILED (rolled back)")
+                    else:
+                        successful_scripts += 1
+                        log(f"Script result: [OK] COMPLETED SUCCESSFULLY")
+                    
+                except FileNotFoundError as e:
+                    failed_scripts += 1
+                    failure_counts["file_not_found"] += 1
+                    log(f"ERROR: File not found - {e}")
+                    log(f"Script result: [X] FAILED")
+                    
+                except Exception as e:
+                    conn.rollback()
+                    failed_scripts += 1
+                    log(f"ERROR: {str(e)}")
+                    log(f"Script result: [X] FAILED")
                 
-            except Exception as e:
-                failed_scripts += 1
-                log_entries.append(f"ERROR: {str(e)}")
-                log_entries.append(f"Script result: [X] FAILED")
+                log("")
+                log("-" * 80)
+                log("")
             
-            log_entries.append("")
-            log_entries.append("-" * 80)
-            log_entries.append("")
-        
-        # Close database connection
-        conn.close()
-        
-        # Summary
-        log_entries.append("=" * 80)
-        log_entries.append("EXECUTION SUMMARY")
-        log_entries.append("=" * 80)
-        log_entries.append(f"Total scripts: {len(script_paths)}")
-        log_entries.append(f"Successful scripts: {successful_scripts}")
-        log_entries.append(f"Failed scripts: {failed_scripts}")
-        log_entries.append(f"Total SQL commands executed: {total_commands}")
-        log_entries.append(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        log_entries.append("=" * 80)
-        
-    except sqlite3.Error as e:
-        log_entries.append(f"DATABASE ERROR: {str(e)}")
-        return False, log_entries
-    except Exception as e:
-        log_entries.append(f"UNEXPECTED ERROR: {str(e)}")
-        return False, log_entries
+            # Close database connection
+            conn.close()
+            
+            # Summary
+            log("=" * 80)
+            log("EXECUTION SUMMARY")
+            log("=" * 80)
+            log(f"Total scripts: {len(script_paths)}")
+            log(f"Successful scripts: {successful_scripts}")
+            log(f"Failed scripts: {failed_scripts}")
+            log(f"Total SQL commands executed: {total_commands}")
+            log(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            log("=" * 80)
+            
+        except sqlite3.Error as e:
+            failure_counts["db_errors"] += 1
+            log(f"DATABASE ERROR: {str(e)}")
+            return False, list(log_tail), failure_counts
+        except Exception as e:
+            log(f"UNEXPECTED ERROR: {str(e)}")
+            return False, list(log_tail), failure_counts
+    finally:
+        if fsync:
+            # One fsync after the buffered writes makes the whole log durable
+            log_fh.flush()
+            os.fsync(log_fh.fileno())
+        log_fh.close()
     
-    # Write log file
-    try:
-        with open(log_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(log_entries))
-        print(f"\n[OK] Log file saved to: {log_file}")
-    except Exception as e:
-        print(f"ERROR: Could not write log file - {e}")
-        return False, log_entries
+    print(f"\n[OK] Log file saved to: {log_file}")
     
     success = failed_scripts == 0
-    return success, log_entries
+    return success, list(log_tail), failure_counts
 
 
 def main():
@@ -318,6 +403,9 @@ Examples:
   
   # Use custom config file
   python run_transformations.py --config custom_config.yaml --latest
+  
+  # Run each script in one executescript call (no per-command log lines)
+  python run_transformations.py --latest --fast
         """
     )
     
@@ -338,6 +426,16 @@ Examples:
         default=None,
         help='Path to config.yaml file (default: project root)'
     )
+    parser.add_argument(
+        '--fast',
+        action='store_true',
+        help='Execute each script with a single executescript call, skipping per-command logging'
+    )
+    parser.add_argument(
+        '--fsync',
+        action='store_true',
+        help='Flush the log file to disk (one fsync) before closing it'
+    )
     
     args = parser.parse_args()
     
@@ -420,23 +518,15 @@ Examples:
     log_file = os.path.join(db_dir, f'transformation_log_{timestamp}.txt')
     
     # Execute transformations
-    success, log_entries = execute_transformation_scripts(db_path, script_paths, log_file)
-    
-    # Read log file and check for failures
-    try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            log_content = f.read()
-    except Exception as e:
-        print(f"ERROR: Could not read log file - {e}")
-        log_content = ""
+    success, log_tail, failure_counts = execute_transformation_scripts(db_path, script_paths, log_file, fast=args.fast, fsync=args.fsync)
     
-    # Check for failure indicators in log
-    failed_commands = log_content.count("✗ Status: FAILED")
-    file_not_found_errors = log_content.count("ERROR: File not found")
-    database_errors = log_content.count("DATABASE ERROR:")
+    # Failures are counted while executing, so the log does not need to be re-read
+    failed_commands = failure_counts["failed_commands"]
+    file_not_found_errors = failure_counts["file_not_found"]
+    database_errors = failure_counts["db_errors"]
     
     # Print summary to console
-    print("\n" + "\n".join(log_entries[-10:]))
+    print("\n" + "\n".join(log_tail))
     
     # Detailed failure report
     if failed_commands > 0 or file_not_found_errors > 0 or database_errors > 0:
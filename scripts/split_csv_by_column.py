@@ -16,16 +16,50 @@ Examples:
 
 import csv
 import os
+import re
 import sys
 import argparse
-from collections import defaultdict
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from pathlib import Path
 
+MAX_OPEN_FILES = 256  # Split files kept open at once while streaming rows
+# Read buffer for the input CSV. Split files keep the default buffer, since up
+# to MAX_OPEN_FILES of them can be open at once.
+INPUT_BUFFER_SIZE = 1 << 20
+
+# Characters dropped from group names to make file names: anything that is not
+# alphanumeric (str.isalnum, so accented letters are kept), space, '-', '_' or '.'
+INVALID_FILENAME_CHARS = re.compile(r'[^\w .-]')
+
+
+@lru_cache(maxsize=None)
+def sanitize_group_name(group_value):
+    """
+    Clean a column value for use as a file name (remove invalid characters).
+    
+    Cached, so each distinct value is cleaned once however many rows share it.
+    
+    Args:
+        group_value: Raw value of the split column
+    
+    Returns:
+        str: The cleaned name, or 'Unknown' if nothing is left
+    """
+    return INVALID_FILENAME_CHARS.sub('', group_value).strip() or 'Unknown'
+
 
 def split_csv_by_column(input_csv_path, column_name='Project', output_folder='splits'):
     """
     Parse a CSV file and split it into individual CSV files organized by a specified column.
     
+    Rows are written to their group's file as they are read, so memory use does
+    not grow with the size of the input. Each row is copied as the text it had
+    in the input rather than re-serialized from its parsed fields; csv.reader
+    only finds the rows and their group values. At most MAX_OPEN_FILES split
+    files are open at once; the least recently used one is closed and reopened
+    for appending when its group shows up again.
+    
     Args:
         input_csv_path: Path to the input CSV file
         column_name: Name of the column to split by (default: 'Project')
@@ -35,6 +69,9 @@ def split_csv_by_column(input_csv_path, column_name='Project', output_folder='sp
         tuple: (success: bool, files_created: int, total_rows: int)
     """
     
+    # Open split files as group name -> file, least recently used first
+    open_files = OrderedDict()
+    
     try:
         # Verify input file exists
         if not os.path.exists(input_csv_path):
@@ -50,15 +87,31 @@ def split_csv_by_column(input_csv_path, column_name='Project', output_folder='sp
         print(f"Output folder: {output_path.absolute()}")
         print("")
         
-        # Dictionary to store data grouped by column value
-        groups_data = defaultdict(list)
+        # Number of rows written to each group's file
+        group_row_counts = Counter()
         
         # Read the input CSV file
-        with open(input_csv_path, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
+        # newline='' lets the csv module handle line endings, including
+        # newlines inside quoted fields
+        with open(input_csv_path, 'r', encoding='utf-8', newline='',
+                  buffering=INPUT_BUFFER_SIZE) as infile:
+            # csv.reader pulls one line at a time from this generator and only as
+            # many as the row needs, so record_lines holds exactly the input
+            # lines of the row it returns next (several if a quoted field has
+            # a newline in it)
+            record_lines = []
+            
+            def read_lines():
+                for line in infile:
+                    record_lines.append(line)
+                    yield line
+            
+            reader = csv.reader(read_lines())
             
             # Store headers
-            headers = reader.fieldnames
+            headers = next(reader, None)
+            header_text = ''.join(record_lines)
+            record_lines.clear()
             
             if not headers:
                 print("[ERROR] CSV file is empty or has no headers")
@@ -70,46 +123,66 @@ def split_csv_by_column(input_csv_path, column_name='Project', output_folder='sp
                 print(f"Available columns: {', '.join(headers)}")
                 return False, 0, 0
             
-            # Group rows by column value
+            column_index = headers.index(column_name)
+            column_count = len(headers)
+            # Rows that need rewriting end with the header's line ending
+            header_body = header_text.rstrip('\r\n')
+            line_ending = header_text[len(header_body):] or '\r\n'
+            
+            print("=" * 80)
+            print("Creating split files...")
+            print("=" * 80)
+            print("")
+            
+            # Write each row to its group's file
             total_rows = 0
             for row in reader:
-                group_value = row.get(column_name, 'Unknown')
+                record = ''.join(record_lines)
+                record_lines.clear()
+                if not row:
+                    # Skip blank lines
+                    continue
+                if len(row) < column_count or not record.endswith('\n'):
+                    # Pad short rows with empty fields so every output row has all
+                    # columns, and end the file's last line if it has no newline
+                    record = (record.rstrip('\r\n') + ',' * (column_count - len(row))
+                              + line_ending)
+                    row += [''] * (column_count - len(row))
                 
-                # Clean group name for filename (remove invalid characters)
-                safe_group_name = "".join(
-                    c for c in group_value if c.isalnum() or c in (' ', '-', '_', '.')
-                ).strip()
+                safe_group_name = sanitize_group_name(row[column_index])
                 
-                if not safe_group_name:
-                    safe_group_name = 'Unknown'
+                outfile = open_files.get(safe_group_name)
+                if outfile is None:
+                    if len(open_files) >= MAX_OPEN_FILES:
+                        _, lru_file = open_files.popitem(last=False)
+                        lru_file.close()
+                    
+                    output_file = output_path / f"{safe_group_name}.csv"
+                    if safe_group_name in group_row_counts:
+                        # Closed earlier to free a handle: continue where it left off
+                        outfile = open(output_file, 'a', newline='', encoding='utf-8')
+                    else:
+                        outfile = open(output_file, 'w', newline='', encoding='utf-8')
+                        outfile.write(header_body + line_ending)
+                    open_files[safe_group_name] = outfile
+                else:
+                    open_files.move_to_end(safe_group_name)
                 
-                groups_data[safe_group_name].append(row)
+                outfile.write(record)
+                group_row_counts[safe_group_name] += 1
                 total_rows += 1
         
+        for outfile in open_files.values():
+            outfile.close()
+        open_files.clear()
+        
         if total_rows == 0:
             print("[WARNING] CSV file contains no data rows")
             return True, 0, 0
         
-        print(f"Total rows read: {total_rows}")
-        print(f"Unique values: {len(groups_data)}")
-        print("")
-        print("=" * 80)
-        print("Creating split files...")
-        print("=" * 80)
-        print("")
-        
-        # Write individual CSV files for each group
-        file_count = 0
-        for group_name, rows in sorted(groups_data.items()):
-            output_file = output_path / f"{group_name}.csv"
-            
-            with open(output_file, 'w', newline='', encoding='utf-8') as outfile:
-                writer = csv.DictWriter(outfile, fieldnames=headers)
-                writer.writeheader()
-                writer.writerows(rows)
-            
-            print(f"[OK] {group_name}.csv ({len(rows)} rows)")
-            file_count += 1
+        for group_name, row_count in sorted(group_row_counts.items()):
+            print(f"[OK] {group_name}.csv ({row_count} rows)")
+        file_count = len(group_row_counts)
         
         print("")
         print("=" * 80)
@@ -128,6 +201,9 @@ def split_csv_by_column(input_csv_path, column_name='Project', output_folder='sp
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}")
         return False, 0, 0
+    finally:
+        for outfile in open_files.values():
+            outfile.close()
 
 
 def main():
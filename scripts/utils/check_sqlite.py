@@ -1,21 +1,49 @@
 #!/usr/bin/env python
+import argparse
 import sqlite3
 
 ############### SET THE PATH HERE ###################
 db_path = 'timekeeping_export.db'
 ######################################################
+parser = argparse.ArgumentParser(description='List the tables in a SQLite database with their row counts.')
+parser.add_argument(
+    '--exact',
+    action='store_true',
+    help='Always run COUNT(*) instead of using the row estimates stored by ANALYZE'
+)
+args = parser.parse_args()
+
 conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
 
 # Get all table names
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-tables = cursor.fetchall()
+tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")]
+
+# Row estimates recorded by the last ANALYZE, if it was ever run. The first
+# number of each sqlite_stat1 entry is the row count of the table or index.
+estimates = {}
+if not args.exact and 'sqlite_stat1' in tables:
+    for table_name, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+        if stat:
+            estimates[table_name] = max(estimates.get(table_name, 0), int(stat.split()[0]))
 
 print(f"Found {len(tables)} tables:")
-for table in tables:
-    table_name = table[0]
-    cursor.execute(f"SELECT COUNT(*) FROM [{table_name}]")
-    count = cursor.fetchone()[0]
-    print(f"  - {table_name}: {count} rows")
+if estimates:
+    print("  (~ marks estimates from the last ANALYZE; use --exact for exact counts)")
+
+counts = {table_name: f"~{count}" for table_name, count in estimates.items()}
+
+# Count the remaining tables in one UNION ALL query instead of one query per table
+# (in groups of 500, SQLite's default limit on terms in a compound SELECT)
+to_count = [table_name for table_name in tables if table_name not in counts]
+for start in range(0, len(to_count), 500):
+    selects = []
+    for table_name in to_count[start:start + 500]:
+        name_literal = table_name.replace("'", "''")
+        selects.append(f"SELECT '{name_literal}', COUNT(*) FROM [{table_name}]")
+    for table_name, count in conn.execute(" UNION ALL ".join(selects)):
+        counts[table_name] = count
+
+for table_name in tables:
+    print(f"  - {table_name}: {counts[table_name]} rows")
 
 conn.close()
@@ -46,9 +46,13 @@ try:
     print(f"\nSample 2025 records:")
     rs_sample = db.OpenRecordset(f"SELECT TOP 5 clientbillingid, [date], projectname FROM [{TABLE_NAME}] WHERE Year([date]) = 2025 ORDER BY [date]")
     if not rs_sample.EOF:
-        rs_sample.MoveFirst()
+        # A newly opened recordset is already on its first record (no MoveFirst needed)
+        # DAO Field objects track the current record, so look them up once
+        id_field = rs_sample.Fields('clientbillingid')
+        date_field = rs_sample.Fields('date')
+        project_field = rs_sample.Fields('projectname')
         while not rs_sample.EOF:
-            print(f"  ID: {rs_sample.Fields('clientbillingid').Value}, Date: {rs_sample.Fields('date').Value}, Project: {rs_sample.Fields('projectname').Value}")
+            print(f"  ID: {id_field.Value}, Date: {date_field.Value}, Project: {project_field.Value}")
             rs_sample.MoveNext()
     else:
         print("  No 2025 records found")
@@ -43,4 +43,16 @@ for row in table_iter:
     count += 1
     print(f"  Table {count}: {row[0]}")
 
+print("\nMETHOD 5: All counts in one UNION ALL query")
+print("="*60)
+cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+table_names = [row[0] for row in cursor.fetchall()]
+selects = []
+for table_name in table_names:
+    name_literal = table_name.replace("'", "''")
+    selects.append(f"SELECT '{name_literal}', COUNT(*) FROM [{table_name}]")
+if selects:
+    for table_name, count in conn.execute(" UNION ALL ".join(selects)):
+        print(f"  - {table_name}: {count} rows")
+
 conn.close()
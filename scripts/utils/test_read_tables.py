@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 import sqlite3
-import pandas as pd
 
 db_path = 'timekeeping_export.db'
 conn = sqlite3.connect(db_path)
@@ -14,10 +13,17 @@ for table in tables:
     print('='*60)
     
     try:
-        df = pd.read_sql_query(f"SELECT * FROM [{table}] LIMIT 5", conn)
-        print(f"Successfully read {len(df)} rows")
-        print(f"Columns: {list(df.columns)}")
-        print(df.head())
+        cursor = conn.execute(f"SELECT * FROM [{table}] LIMIT 5")
+        columns = [description[0] for description in cursor.description]
+        rows = cursor.fetchall()
+        print(f"Successfully read {len(rows)} rows")
+        print(f"Columns: {columns}")
+        
+        # Print the sample as a table, each column as wide as its longest value
+        cells = [columns] + [[str(value) for value in row] for row in rows]
+        widths = [max(len(cell[i]) for cell in cells) for i in range(len(columns))]
+        for cell in cells:
+            print("  ".join(value.ljust(width) for value, width in zip(cell, widths)))
     except Exception as e:
         print(f"ERROR reading {table}: {e}")
 
@@ -4,19 +4,37 @@ CSV Validation Script - Validates exported time entry CSV files against configur
 This script:
 1. Finds the latest CSV file from the ExportTimeEntries process
 2. Loads the CSV data
-3. Applies regex validation rules from config.yaml to each row and column
+3. Applies regex validation rules from config.yaml to each column, once per distinct value
 4. Generates a detailed validation report with errors and warnings
 """
 
 import os
 import re
-import csv
 import json
 import sys
 from datetime import datetime
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
+import pandas as pd
 import yaml
 
+# libyaml's C loader parses config.yaml about 10x faster than the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+VALIDATION_CHUNK_ROWS = 100000  # Rows read and validated at a time, so memory use stays flat
+
+# Fields of a validation error, the columns of CSVValidator.errors
+ERROR_FIELDS = ['row', 'column', 'value', 'rule', 'regex', 'description']
+
+
+def sql_string(value):
+    """Quote a value as a SQLite string literal, doubling any single quotes."""
+    return "'" + str(value).replace("'", "''") + "'"
+
 
 class CSVValidator:
     def __init__(self, config_path="config.yaml"):
@@ -24,9 +42,13 @@ class CSVValidator:
         self.config_path = config_path
         self.config = self._load_config()
         self.validation_rules = self.config.get("csv_validation_rules", [])
-        self.errors = []
+        # Errors are kept column-wise in a DataFrame (one row per error) rather
+        # than as one dict per error, which matters when every row fails a rule
+        self.errors = pd.DataFrame(columns=ERROR_FIELDS)
+        self.errors_by_column = {}
         self.warnings = []
-        self.validation_results = []
+        self.validation_results = self.errors
+        self._compile_rules()
 
     def _load_config(self):
         """Load configuration from YAML file."""
@@ -34,107 +56,163 @@ class CSVValidator:
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         
         with open(self.config_path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=SafeLoader)
 
-    def find_latest_csv(self, search_dir="output"):
-        """Find the latest CSV file created by ExportTimeEntries process."""
-        latest_file = None
-        latest_time = None
+    def _compile_rules(self):
+        """Compile each enabled rule's regex once, warning about invalid patterns."""
+        for rule in self.validation_rules:
+            if not rule.get('enabled', True):
+                continue
+            
+            try:
+                rule['_compiled'] = re.compile(rule.get('regex'))
+            except (re.error, TypeError) as e:
+                # Rules with an invalid pattern are skipped during validation
+                rule['_compiled'] = None
+                self.warnings.append({
+                    'type': 'regex_error',
+                    'rule': rule.get('name'),
+                    'error': str(e)
+                })
+
+    def _scan_csv_files(self, directory, recursive=True, prefix=''):
+        """
+        Yield (mtime, path) for the CSV files in a directory.
         
-        # Search for CSV files in the output directory and its subdirectories
-        for root, dirs, files in os.walk(search_dir):
-            for file in files:
-                if file.endswith('.csv'):
-                    file_path = os.path.join(root, file)
-                    file_mtime = os.path.getmtime(file_path)
-                    
-                    if latest_time is None or file_mtime > latest_time:
-                        latest_time = file_mtime
-                        latest_file = file_path
+        Uses os.scandir so the file type comes from the directory listing and
+        only one stat call is made per CSV file.
+        """
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            return
         
-        # Also check root directory for recent CSV files
-        for file in os.listdir('.'):
-            if file.endswith('.csv') and file.startswith('results_'):
-                file_path = os.path.abspath(file)
-                file_mtime = os.path.getmtime(file_path)
-                
-                if latest_time is None or file_mtime > latest_time:
-                    latest_time = file_mtime
-                    latest_file = file_path
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Like os.walk, do not descend into symlinked directories
+                    if recursive and not entry.is_symlink():
+                        yield from self._scan_csv_files(entry.path, recursive, prefix)
+                elif entry.name.endswith('.csv') and entry.name.startswith(prefix):
+                    yield entry.stat().st_mtime, entry.path
+
+    def find_latest_csv(self, search_dir="output"):
+        """Find the latest CSV file created by ExportTimeEntries process."""
+        # CSV files in the output directory and its subdirectories, plus
+        # results_*.csv files written to the current directory by query_to_csv.py
+        candidates = chain(
+            self._scan_csv_files(search_dir),
+            ((mtime, os.path.abspath(path))
+             for mtime, path in self._scan_csv_files('.', recursive=False, prefix='results_'))
+        )
         
-        return latest_file
+        latest = max(candidates, key=itemgetter(0), default=None)
+        return latest[1] if latest else None
 
     def load_csv(self, csv_path):
-        """Load CSV file and return rows."""
+        """Open a CSV file for reading in DataFrame chunks, keeping every value as text."""
         if not os.path.exists(csv_path):
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
         
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            return list(reader), reader.fieldnames
-
-    def validate_row(self, row, row_num, fieldnames):
-        """Validate a single row against all enabled rules."""
-        row_errors = []
+        # Read only the header's columns: a row with extra fields then keeps its
+        # values and row number (the extras are ignored) instead of stopping
+        # the parser with "Expected N fields"
+        column_count = len(pd.read_csv(csv_path, dtype=str, encoding='utf-8', nrows=0).columns)
         
+        # na_filter=False keeps empty cells as '' instead of NaN. The chunks share
+        # one continuous row index, so row numbers stay file-wide.
+        return pd.read_csv(csv_path, dtype=str, encoding='utf-8', na_filter=False,
+                           usecols=range(column_count), chunksize=VALIDATION_CHUNK_ROWS)
+
+    def _rules_for_columns(self, fieldnames):
+        """Return the enabled rules that can run against these columns, warning once about the rest."""
+        rules = []
         for rule in self.validation_rules:
-            if not rule.get('enabled', True):
+            if not rule.get('enabled', True) or rule['_compiled'] is None:
                 continue
             
-            column = rule.get('column')
-            regex_pattern = rule.get('regex')
-            rule_name = rule.get('name')
-            
-            if column not in fieldnames:
+            if rule.get('column') not in fieldnames:
                 self.warnings.append({
                     'type': 'config_warning',
-                    'message': f"Column '{column}' specified in rule '{rule_name}' not found in CSV"
+                    'message': f"Column '{rule.get('column')}' specified in rule '{rule.get('name')}' not found in CSV"
                 })
                 continue
             
-            value = row.get(column, '').strip()
-            
-            try:
-                if not re.search(regex_pattern, value):
-                    row_errors.append({
-                        'row': row_num,
-                        'column': column,
-                        'value': value,
-                        'rule': rule_name,
-                        'regex': regex_pattern,
-                        'description': rule.get('description', '')
-                    })
-            except re.error as e:
-                self.warnings.append({
-                    'type': 'regex_error',
-                    'rule': rule_name,
-                    'error': str(e)
-                })
+            rules.append(rule)
+        return rules
+
+    def validate_column(self, df, rule):
+        """Validate one column against a rule, checking all rows of the DataFrame at once."""
+        column = rule.get('column')
+        
+        values = df[column].str.strip()
+        # Columns repeat a small set of values (dates, hours, projects), so run
+        # the regex once per distinct value and map the result back to the rows
+        search = rule['_compiled'].search
+        failing = [value for value in pd.unique(values) if not search(value)]
+        bad_values = values[values.isin(failing)]
         
-        return row_errors
+        return pd.DataFrame({
+            'row': bad_values.index.to_numpy() + 2,  # Header is row 1
+            'column': column,
+            'value': bad_values.to_numpy(),
+            'rule': rule.get('name'),
+            'regex': rule.get('regex'),
+            'description': rule.get('description', '')
+        }, columns=ERROR_FIELDS)
 
     def validate_csv(self, csv_path):
-        """Validate entire CSV file against all rules."""
-        rows, fieldnames = self.load_csv(csv_path)
+        """Validate entire CSV file against all rules, one chunk of rows at a time."""
+        fieldnames = None
+        rules = []
+        total_rows = 0
+        error_frames = []
+        
+        # Validate column by column within each chunk, one pass per rule
+        for chunk in self.load_csv(csv_path):
+            if fieldnames is None:
+                fieldnames = list(chunk.columns)
+                rules = self._rules_for_columns(fieldnames)
+            
+            total_rows += len(chunk)
+            for rule in rules:
+                error_frames.append(self.validate_column(chunk, rule))
         
         print(f"\n{'='*80}")
         print(f"CSV Validation Report")
         print(f"{'='*80}")
         print(f"File: {csv_path}")
         print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"Total Rows: {len(rows)}")
+        print(f"Total Rows: {total_rows}")
         print(f"Columns: {len(fieldnames)}")
         print(f"Active Validation Rules: {sum(1 for r in self.validation_rules if r.get('enabled', True))}")
         print(f"{'='*80}\n")
         
-        # Validate each row
-        for row_num, row in enumerate(rows, start=2):  # Start at 2 (header is row 1)
-            row_errors = self.validate_row(row, row_num, fieldnames)
-            self.validation_results.extend(row_errors)
-            self.errors.extend(row_errors)
+        # Report errors row by row, in rule order within a row (the sort is stable)
+        if error_frames:
+            errors = pd.concat(error_frames, ignore_index=True)
+            self.errors = errors.sort_values('row', kind='stable', ignore_index=True)
+            self.validation_results = self.errors
+            self._group_errors()
         
         return self._generate_report()
 
+    def _group_errors(self):
+        """Summarize the errors per column once, for both the printed report and the SQL queries."""
+        self.errors_by_column = {}
+        
+        # Columns in order of their first error; the first error names the rule
+        for column, col_errors in self.errors.groupby('column', sort=False):
+            first_error = col_errors.iloc[0]
+            self.errors_by_column[column] = {
+                'count': len(col_errors),
+                'rule': first_error['rule'],
+                'regex': first_error['regex'],
+                'description': first_error['description'],
+                'examples': list(zip(col_errors['row'].head(5), col_errors['value'].head(5))),
+                'bad_values': col_errors['value'].unique()
+            }
+
     def _generate_report(self):
         """Generate validation report."""
         report = {
@@ -145,31 +223,24 @@ class CSVValidator:
             'warnings': self.warnings
         }
         
-        if self.errors:
+        if len(self.errors):
             print(f"\n{'!'*80}")
             print(f"VALIDATION ERRORS: {len(self.errors)} issues found")
             print(f"{'!'*80}\n")
             
-            # Group errors by column
-            errors_by_column = {}
-            for error in self.errors:
-                col = error['column']
-                if col not in errors_by_column:
-                    errors_by_column[col] = []
-                errors_by_column[col].append(error)
-            
-            for column, col_errors in errors_by_column.items():
-                print(f"\n[{column}] - {len(col_errors)} errors")
-                print(f"  Rule: {col_errors[0]['rule']}")
-                print(f"  Description: {col_errors[0]['description']}")
-                print(f"  Regex: {col_errors[0]['regex']}")
+            # Errors by column, in order of first appearance
+            for column, col_info in self.errors_by_column.items():
+                print(f"\n[{column}] - {col_info['count']} errors")
+                print(f"  Rule: {col_info['rule']}")
+                print(f"  Description: {col_info['description']}")
+                print(f"  Regex: {col_info['regex']}")
                 
                 # Show first 5 error examples
-                for error in col_errors[:5]:
-                    print(f"    Row {error['row']}: '{error['value']}'")
+                for row, value in col_info['examples']:
+                    print(f"    Row {row}: '{value}'")
                 
-                if len(col_errors) > 5:
-                    print(f"    ... and {len(col_errors) - 5} more errors")
+                if col_info['count'] > 5:
+                    print(f"    ... and {col_info['count'] - 5} more errors")
         else:
             print(f"\n{'✓'*80}")
             print("✓ All validation checks passed!")
@@ -186,41 +257,43 @@ class CSVValidator:
         return report
 
     def save_report(self, report, output_path=None):
-        """Save validation report to JSON file."""
+        """Save validation report to JSON file, with the errors in a JSON Lines file beside it."""
         if output_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = f"validation_report_{timestamp}.json"
         
+        # Errors go to a JSON Lines file next to the report, one compact object
+        # per line, written a slice at a time so the serialized text of every
+        # error is never held in memory at once
+        output_path = Path(output_path)
+        errors_path = output_path.with_name(f"{output_path.stem}_errors.jsonl")
+        errors = report['errors']
+        with open(errors_path, 'w', encoding='utf-8') as f:
+            for start in range(0, len(errors), VALIDATION_CHUNK_ROWS):
+                f.write(errors.iloc[start:start + VALIDATION_CHUNK_ROWS]
+                        .to_json(orient='records', lines=True))
+        
+        # The JSON report keeps the counts and warnings and names the errors file
+        report = dict(report, errors_file=str(errors_path))
+        del report['errors']
         with open(output_path, 'w') as f:
             json.dump(report, f, indent=2)
         
         print(f"\nReport saved to: {output_path}")
-        return output_path
+        print(f"Errors saved to: {errors_path}")
+        return str(output_path)
 
     def generate_sql_queries(self, report, table_name="TimeEntries"):
         """Generate SQL queries to find bad values in SQLite database."""
         queries = []
         
-        if not report['errors']:
+        if report['errors'].empty:
             return queries
         
-        # Group errors by column and rule
-        errors_by_column = {}
-        for error in report['errors']:
-            col = error['column']
-            if col not in errors_by_column:
-                errors_by_column[col] = {
-                    'rule': error['rule'],
-                    'regex': error['regex'],
-                    'description': error['description'],
-                    'bad_values': set()
-                }
-            errors_by_column[col]['bad_values'].add(error['value'])
-        
-        # Generate SQL for each column with errors
-        for column, col_info in errors_by_column.items():
+        # Generate SQL for each column with errors, using the grouping made by validate_csv
+        for column, col_info in self.errors_by_column.items():
             rule = col_info['rule']
-            bad_values = sorted(list(col_info['bad_values']))
+            bad_values = sorted(col_info['bad_values'])
             
             # Build comment
             comment = f"-- {rule}\n"
@@ -229,36 +302,29 @@ class CSVValidator:
             
             # Query 1: Find all rows with specific bad values
             if bad_values:
-                value_conditions = " OR ".join([
-                    f'"{column}" = {repr(v)}' for v in bad_values
-                ])
+                # One IN list rather than an OR per value: SQLite probes it like a
+                # set, and an OR chain of over 1000 terms exceeds its expression depth
+                value_list = ", ".join(sql_string(v) for v in bad_values)
                 query1 = f"""{comment}
 SELECT * FROM "{table_name}"
-WHERE {value_conditions};"""
+WHERE "{column}" IN ({value_list});"""
                 queries.append({
                     'name': f'Find {column} with bad values',
                     'column': column,
                     'query': query1
                 })
             
-            # Query 2: Find all rows NOT matching pattern (using GLOB or LIKE depending on regex complexity)
-            # For simple patterns, we can use SQLite's GLOB or REGEXP if available
-            query2_comment = f"""-- Find all rows where {column} does NOT match expected pattern
--- Pattern: {col_info['regex']}"""
-            
-            # Generate a SQLite NOT LIKE pattern if possible, or flag for manual review
-            pattern_note = f"-- Note: This column has regex pattern: {col_info['regex']}\n"
-            pattern_note += "-- Manual pattern matching or application-level filtering may be needed\n"
-            pattern_note += "-- Review the following for invalid values:\n"
-            
-            query2 = f"""{query2_comment}
-{pattern_note}SELECT DISTINCT "{column}", COUNT(*) as count
-FROM "{table_name}"
-GROUP BY "{column}"
-ORDER BY count DESC;"""
+            # Query 2: Find all rows NOT matching pattern. The validator strips
+            # values before matching, so the query trims them the same way
+            query2 = f"""-- Find all rows where {column} does NOT match expected pattern
+-- Pattern: {col_info['regex']}
+-- REGEXP needs a regexp function: query_to_csv.py registers one, as do
+-- DB Browser for SQLite and the sqlean regexp extension
+SELECT * FROM "{table_name}"
+WHERE trim("{column}") NOT REGEXP {sql_string(col_info['regex'])};"""
             
             queries.append({
-                'name': f'Review all {column} values',
+                'name': f'Find {column} not matching pattern',
                 'column': column,
                 'query': query2
             })